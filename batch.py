@@ -0,0 +1,221 @@
+"""Headless batch evaluation of strings with the NPDA acceptance logic.
+
+Reads newline-delimited strings from files (or stdin) as a stream, decides
+them across a pool of worker processes and writes one result per line as
+JSONL or CSV:
+
+    python3 batch.py corpus.txt --format csv -o results.csv
+    cat corpus.txt | python3 batch.py --workers 4
+    python3 batch.py corpus.txt --machine machines/anbn.json
+    python3 batch.py corpus.txt --cache results.db
+
+Only a bounded number of chunks is in flight at any time, so memory stays
+flat however large the input is. With a cache, strings that were decided
+before (in this run or, with a cache file, in an earlier one) are answered
+by the parent process and never sent to a worker.
+"""
+import argparse
+import collections
+import csv
+import fileinput
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import cache
+import machine
+import npda
+import vectorized
+
+INVALID = "invalid"
+FIELDS = ("line", "input", "accepted", "reason", "position", "expected", "got", "message")
+
+MACHINE = None  # machine.Machine used instead of the palindrome NPDA, per process
+
+
+def load_machine(path):
+    """Worker initializer: load the machine definition once per process"""
+    global MACHINE
+    MACHINE = machine.load_machine(path) if path else None
+
+
+def decide(line_number, string, result=None):
+    """Build the output record for one input line, from its result if already decided"""
+    if MACHINE is not None:
+        return decide_machine(line_number, string)
+    if result is None:
+        warning = npda.validate(string)
+        if warning:
+            return {"line": line_number, "input": string, "accepted": False, "reason": INVALID,
+                    "position": None, "expected": None, "got": None, "message": warning}
+        result = npda.run(string)
+    return {"line": line_number, "input": string, "accepted": result.accepted,
+            "reason": result.reason, "position": result.position,
+            "expected": result.expected, "got": result.got, "message": result.describe()}
+
+
+def decide_machine(line_number, string):
+    warning = MACHINE.validate(string)
+    if warning:
+        return {"line": line_number, "input": string, "accepted": False, "reason": INVALID,
+                "position": None, "expected": None, "got": None, "message": warning}
+    result = MACHINE.run(string)
+    return {"line": line_number, "input": string, "accepted": result.accepted,
+            "reason": result.reason, "position": result.position,
+            "expected": None, "got": result.got, "message": result.describe()}
+
+
+def decide_chunk(chunk):
+    """Worker entry point: decide a list of (line number, string) pairs"""
+    if MACHINE is not None:
+        return [decide(line_number, string) for line_number, string in chunk]
+    # Strings of equal length are decided together; invalid ones get None and are validated in decide()
+    results = vectorized.decide_all(string for _, string in chunk)
+    return [decide(line_number, string, result) for (line_number, string), result in zip(chunk, results)]
+
+
+def read_chunks(lines, chunk_size):
+    """Group stripped input lines into numbered chunks without reading ahead"""
+    chunk = []
+    for line_number, line in enumerate(lines, 1):
+        chunk.append((line_number, line.rstrip("\r\n")))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def split_cached(chunk, results):
+    """Records of the strings in a cache.ResultCache and the chunk left to decide"""
+    hits, misses = [], []
+    for line_number, string in chunk:
+        cached = results.get(string)
+        if cached is None:
+            misses.append((line_number, string))
+        else:
+            hits.append({"line": line_number, "input": string, **cached})
+    return hits, misses
+
+
+def merge_cached(hits, records, results):
+    """Store freshly decided records and interleave them with the hits by line"""
+    for record in records:
+        results.put(record["input"], {field: record[field] for field in FIELDS[2:]})
+    if not hits:
+        return records
+    return sorted(hits + records, key=lambda record: record["line"])
+
+
+def evaluate(lines, workers=None, chunk_size=1000, machine_path=None, results=None):
+    """Yield a result record for every line, in input order.
+
+    `results` is an optional cache.ResultCache consulted before deciding.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = read_chunks(lines, chunk_size)
+    if workers == 1:
+        load_machine(machine_path)
+        for chunk in chunks:
+            if results is None:
+                yield from decide_chunk(chunk)
+            else:
+                hits, misses = split_cached(chunk, results)
+                yield from merge_cached(hits, decide_chunk(misses), results)
+        return
+
+    # Pool.imap consumes its input eagerly; the semaphore keeps the number of
+    # chunks that have been read but not yet written bounded.
+    in_flight = threading.BoundedSemaphore(workers * 4)
+    # Cache hits of the chunks in flight, in the order imap returns them
+    pending_hits = collections.deque()
+
+    def bounded_chunks():
+        for chunk in chunks:
+            in_flight.acquire()
+            if results is not None:
+                hits, chunk = split_cached(chunk, results)
+                pending_hits.append(hits)
+            yield chunk
+
+    with multiprocessing.Pool(workers, load_machine, (machine_path,)) as pool:
+        for records in pool.imap(decide_chunk, bounded_chunks()):
+            in_flight.release()
+            if results is not None:
+                records = merge_cached(pending_hits.popleft(), records, results)
+            yield from records
+
+
+class JsonlWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class CsvWriter:
+    def __init__(self, stream):
+        self.writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        self.writer.writeheader()
+
+    def write(self, record):
+        self.writer.writerow(record)
+
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decide newline-delimited strings with the palindrome NPDA")
+    parser.add_argument("files", nargs="*", help="input files, '-' or nothing for stdin")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl", help="output format")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="strings sent to a worker at a time")
+    parser.add_argument("--machine", help="decide with a PDA loaded from a JSON/YAML definition")
+    parser.add_argument("--cache", metavar="FILE", help="reuse and store results in a SQLite cache file")
+    parser.add_argument("--cache-size", type=int, default=cache.DEFAULT_CAPACITY,
+                        help="results kept in the cache (least recently used are evicted)")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.chunk_size < 1 or args.cache_size < 1:
+        parser.error("--workers, --chunk-size and --cache-size must be positive")
+    namespace = "batch"
+    if args.machine:
+        try:
+            namespace += ":" + machine.load_machine(args.machine).digest
+        except (OSError, ValueError) as error:
+            parser.error(f"--machine: {error}")
+    results = cache.ResultCache(args.cache_size, args.cache, namespace) if args.cache else None
+
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    writer = WRITERS[args.format](output)
+    counts = {True: 0, False: 0}
+    start = time.perf_counter()
+    try:
+        with fileinput.input(args.files, encoding="utf-8") as lines:
+            for record in evaluate(lines, args.workers, args.chunk_size, args.machine, results):
+                counts[record["accepted"]] += 1
+                writer.write(record)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if results is not None:
+            results.close()
+
+    elapsed = time.perf_counter() - start
+    total = counts[True] + counts[False]
+    print(f"{total} strings: {counts[True]} accepted, {counts[False]} rejected "
+          f"in {elapsed:.2f}s with {args.workers} workers", file=sys.stderr)
+    if results is not None:
+        print(f"cache: {results.describe()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
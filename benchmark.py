@@ -0,0 +1,287 @@
+"""Reproducible benchmarks for the NPDA engine and the canvas renderer.
+
+Measures simulation throughput (steps/s and strings/s) for input lengths
+from 10 to 10^6, batch throughput for corpora of equal-length strings, the
+wall-clock cost of a render call for varying tape and stack sizes, and
+peak memory. Results are written as JSON and can be
+compared against a saved baseline:
+
+    python3 benchmark.py -o baseline.json
+    python3 benchmark.py --compare baseline.json --tolerance 0.15
+    python3 benchmark.py --startup-only
+
+Rendering needs a display; on a headless server run it under Xvfb:
+
+    xvfb-run python3 benchmark.py
+
+Startup is measured in fresh interpreters and checked against
+STARTUP_BUDGET_MS, the time a command may take on top of a bare
+`python3 -c pass`; the deciding command line must not import tkinter.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import fastpath
+import npda
+import vectorized
+
+LENGTHS = (10, 100, 1000, 10 ** 4, 10 ** 5, 10 ** 6)
+QUICK_LENGTHS = (10, 100, 1000, 10 ** 4)
+RENDER_LENGTHS = (10, 100, 1000, 10 ** 4)
+BATCH_ROWS = 10000  # strings per corpus of the batch benchmarks
+BATCH_LENGTHS = (16, 64, 256)
+
+STARTUP_RUNS = 7  # fresh interpreters per command; the fastest run counts
+STARTUP_COMMANDS = {
+    "interpreter": ["-c", "pass"],
+    "import_npda": ["-c", "import npda"],
+    # The command line check, failing if it loaded Tk
+    "cli_check": ["-c", "import sys, visualizer; visualizer.main(['abba']); sys.exit('tkinter' in sys.modules)"],
+    "import_gui": ["-c", "import gui"],
+}
+STARTUP_BUDGET_MS = {"import_npda": 5, "cli_check": 10, "import_gui": 100}
+
+
+def palindrome(length, seed=0):
+    """Random member of ww^r with the given (even) length"""
+    rng = random.Random(seed)
+    half = "".join(rng.choice(npda.ALPHABET) for _ in range(length // 2))
+    return half + half[::-1]
+
+
+def timed(function, min_time=0.2):
+    """Call function repeatedly for at least min_time seconds, return seconds per call"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / calls
+
+
+def step_through(string):
+    """Run the step-by-step engine over the accepting branch, return the step count"""
+    engine = npda.PalindromeNPDA(string)
+    steps = 0
+    for _ in range(len(string) // 2):
+        engine.step()
+        steps += 1
+    engine.choose_center()
+    while engine.step() == npda.CONTINUE:
+        steps += 1
+    return steps + 2
+
+
+def bench_simulation(lengths, min_time):
+    results = {}
+    for length in lengths:
+        string = palindrome(length)
+        prefix = f"simulation.n={length}"
+
+        start = time.perf_counter()
+        steps = step_through(string)
+        results[f"{prefix}.engine_steps_per_s"] = steps / (time.perf_counter() - start)
+        results[f"{prefix}.run_strings_per_s"] = 1 / timed(lambda: npda.run(string), min_time)
+        results[f"{prefix}.fastpath_strings_per_s"] = 1 / timed(lambda: fastpath.decide(string), min_time)
+    return results
+
+
+def bench_batch(lengths, min_time):
+    """Strings per second for a corpus of equal-length strings, one run each vs. vectorized"""
+    results = {}
+    for length in lengths:
+        corpus = [palindrome(length, seed) for seed in range(BATCH_ROWS)]
+        prefix = f"batch.n={length}"
+        results[f"{prefix}.run_strings_per_s"] = BATCH_ROWS / timed(
+            lambda: [npda.run(string) for string in corpus], min_time)
+        results[f"{prefix}.vectorized_strings_per_s"] = BATCH_ROWS / timed(
+            lambda: vectorized.decide(corpus), min_time)
+    return results
+
+
+def bench_startup(runs=STARTUP_RUNS):
+    """Wall-clock time of fresh interpreters running each startup command"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for name, arguments in STARTUP_COMMANDS.items():
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            completed = subprocess.run([sys.executable, *arguments], cwd=directory,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elapsed = (time.perf_counter() - start) * 1000
+            if completed.returncode:
+                break  # e.g. no tkinter here, or the check imported it
+            best = elapsed if best is None else min(best, elapsed)
+        if best is None:
+            print(f"startup command {name} failed", file=sys.stderr)
+            continue
+        results[f"startup.{name}_ms"] = best
+    return results
+
+
+def check_startup(results):
+    """Return a list of startup commands over their budget"""
+    base = results.get("startup.interpreter_ms")
+    if base is None:
+        return []
+    failures = []
+    for name, budget in STARTUP_BUDGET_MS.items():
+        elapsed = results.get(f"startup.{name}_ms")
+        if elapsed is None:
+            if name != "import_gui":  # the GUI may legitimately be missing tkinter
+                failures.append(f"{name}: failed")
+        elif elapsed - base > budget:
+            failures.append(f"{name}: {elapsed - base:.1f} ms over the interpreter start "
+                            f"(budget {budget} ms)")
+    return failures
+
+
+def bench_memory(length):
+    string = palindrome(length)
+    results = {}
+    for name, function in (("engine", lambda: step_through(string)),
+                           ("run", lambda: npda.run(string)),
+                           ("fastpath", lambda: fastpath.decide(string))):
+        tracemalloc.start()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[f"memory.n={length}.{name}_peak_bytes"] = peak
+    return results
+
+
+def bench_render(lengths, steps=200):
+    """Average cost of a render call while stepping, including Tk's idle work"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as error:  # no tkinter or no display
+        print(f"render benchmarks skipped: {error}", file=sys.stderr)
+        return {}
+
+    from renderer import PDARenderer
+
+    results = {}
+    try:
+        root.geometry("1000x400")
+        canvas = tk.Canvas(root, width=1000, height=400, bg="white")
+        canvas.pack()
+        root.update()
+        for length in lengths:
+            renderer = PDARenderer(canvas)
+            renderer.invalidate()
+            string = palindrome(length)
+            engine = npda.PalindromeNPDA(string)
+
+            start = time.perf_counter()
+            renderer.render(1000, 400, engine.state, string, engine.position, engine.stack)
+            root.update_idletasks()
+            results[f"render.n={length}.first_draw_ms"] = (time.perf_counter() - start) * 1000
+
+            # Step through the pushing phase and into the matching phase
+            total = 0.0
+            count = 0
+            for i in range(min(steps, length)):
+                if i == length // 2:
+                    engine.choose_center()
+                elif engine.step() != npda.CONTINUE:
+                    break
+                start = time.perf_counter()
+                renderer.render(1000, 400, engine.state, string, engine.position, engine.stack)
+                root.update_idletasks()
+                total += time.perf_counter() - start
+                count += 1
+            results[f"render.n={length}.step_ms"] = total / max(count, 1) * 1000
+            results[f"render.n={length}.canvas_items"] = len(canvas.find_all())
+    finally:
+        root.destroy()
+    return results
+
+
+def higher_is_better(metric):
+    return metric.endswith("_per_s")
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of human readable regressions beyond the tolerance"""
+    regressions = []
+    for metric, old in sorted(baseline.items()):
+        new = results.get(metric)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        if higher_is_better(metric):
+            change = -change
+        if change > tolerance:
+            regressions.append(f"{metric}: {old:.6g} -> {new:.6g} ({change:+.1%} worse)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the NPDA engine and renderer")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved JSON result")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--quick", action="store_true", help="only short inputs")
+    parser.add_argument("--no-render", action="store_true", help="skip the Tk render benchmarks")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="seconds spent timing each throughput metric")
+    parser.add_argument("--startup-only", action="store_true",
+                        help="only measure startup and check it against the budget")
+    args = parser.parse_args(argv)
+
+    lengths = QUICK_LENGTHS if args.quick else LENGTHS
+    results = bench_startup()
+    if not args.startup_only:
+        results.update(bench_simulation(lengths, args.min_time))
+        results.update(bench_batch(BATCH_LENGTHS[:1] if args.quick else BATCH_LENGTHS, args.min_time))
+        results.update(bench_memory(lengths[-1]))
+        if not args.no_render:
+            results.update(bench_render(RENDER_LENGTHS[:3] if args.quick else RENDER_LENGTHS))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+    over_budget = check_startup(results)
+    for failure in over_budget:
+        print(f"OVER STARTUP BUDGET {failure}", file=sys.stderr)
+    if over_budget:
+        return 1
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions against {args.compare}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
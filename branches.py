@@ -0,0 +1,235 @@
+"""Simulation of every center guess of the palindrome NPDA at once.
+
+Each branch guesses the center at a different position. All branches push
+the same prefix before guessing, so their stacks are kept as persistent
+linked stacks that share that prefix: spawning a branch takes the current
+node of the pushing branch and popping moves a branch's pointer down, so no
+stack is ever copied. Memory is the pushed prefix once plus O(1) per live
+branch, however deep the stacks are.
+
+The visualizer steps a BranchExplorer to animate the live branches. For
+large inputs explore() splits the centers across worker processes:
+
+    python3 branches.py abbaabba --workers 4
+"""
+import argparse
+import os
+import sys
+
+import npda
+
+PARALLEL_THRESHOLD = 20000  # input length from which explore() uses worker processes
+
+
+class Node:
+    """Cell of a persistent stack: a symbol on top of the cell below it"""
+    __slots__ = ("symbol", "below", "depth")
+
+    def __init__(self, symbol, below):
+        self.symbol = symbol
+        self.below = below
+        self.depth = below.depth + 1 if below is not None else 1
+
+
+class SharedStack:
+    """Immutable stack view over shared nodes, drawable like a PushdownStack"""
+    __slots__ = ("top",)
+
+    def __init__(self, top=None):
+        self.top = top
+
+    def push(self, symbol):
+        return SharedStack(Node(symbol, self.top))
+
+    def pop(self):
+        return SharedStack(self.top.below)
+
+    def peek(self):
+        return self.top.symbol if self.top is not None else None
+
+    def __len__(self):
+        return self.top.depth if self.top is not None else 0
+
+    def __getitem__(self, index):
+        """Symbol at index (0 is the bottom); walks down from the top"""
+        depth = len(self)
+        if index < 0:
+            index += depth
+        if not 0 <= index < depth:
+            raise IndexError("stack index out of range")
+        node = self.top
+        for _ in range(depth - 1 - index):
+            node = node.below
+        return node.symbol
+
+    def __iter__(self):
+        symbols = []
+        node = self.top
+        while node is not None:
+            symbols.append(node.symbol)
+            node = node.below
+        return reversed(symbols)
+
+    def summary(self, k=8):
+        depth = len(self)
+        top = []
+        node = self.top
+        while node is not None and len(top) < k:
+            top.append(node.symbol)
+            node = node.below
+        top.reverse()
+        if depth <= k:
+            return str(top)
+        return f"[…, {', '.join(map(repr, top))}] (depth {depth})"
+
+
+class Branch:
+    """One center guess: matching in q1 from the stack pushed before the center"""
+    __slots__ = ("center", "state", "stack", "result")
+
+    def __init__(self, center, stack):
+        self.center = center
+        self.state = npda.Q1
+        self.stack = stack
+        self.result = None
+
+    @property
+    def alive(self):
+        return self.result is None
+
+
+class BranchExplorer:
+    """Steps every branch of the nondeterministic center guess in lockstep.
+
+    After step() has read the symbol at `position`, `live` holds the branches
+    that can still accept; the pushing branch (state q0) is `stack` itself.
+    Only branches with centers in `centers` are spawned, so ranges of centers
+    can be explored independently.
+    """
+
+    def __init__(self, string, centers=None):
+        self.string = string
+        self.centers = range(len(string) + 1) if centers is None else centers
+        self.position = 0
+        self.stack = SharedStack()  # the pushing branch, shared by every spawned branch
+        self.branches = {}  # center -> Branch
+        self.live = []
+        self.accepted = []
+        self.spawn()
+
+    @property
+    def done(self):
+        return self.position > len(self.string)
+
+    @property
+    def live_count(self):
+        return len(self.live)
+
+    def spawn(self):
+        # Branches are spawned in order, so only the current position is checked
+        if self.position in self.centers:
+            branch = Branch(self.position, self.stack)
+            self.branches[self.position] = branch
+            self.live.append(branch)
+
+    def step(self):
+        """Read the next symbol on every live branch; returns False once all have halted"""
+        string, position = self.string, self.position
+        if position == len(string):
+            # End of input: a branch accepts when only Z₀ is left (and w was not empty)
+            for branch in self.live:
+                if not string:
+                    branch.result = npda.Result(False, npda.EMPTY_INPUT, 0, center=branch.center)
+                elif branch.stack.top is None:
+                    branch.state = npda.Q2
+                    branch.result = npda.Result(True, center=branch.center)
+                    self.accepted.append(branch.center)
+                else:
+                    branch.result = npda.Result(False, npda.STACK_NOT_EMPTY, position,
+                                                center=branch.center)
+            self.live = []
+            self.position += 1
+            return False
+
+        symbol = string[position]
+        survivors = []
+        for branch in self.live:
+            top = branch.stack.top
+            if top is None:
+                branch.result = npda.Result(False, npda.STACK_EMPTY_EARLY, position, center=branch.center)
+            elif top.symbol != symbol:
+                branch.result = npda.Result(False, npda.MISMATCH, position, top.symbol, symbol,
+                                            branch.center)
+            else:
+                branch.stack = SharedStack(top.below)
+                survivors.append(branch)
+        self.live = survivors
+        self.stack = self.stack.push(symbol)
+        self.position += 1
+        self.spawn()
+        return True
+
+    def run(self):
+        last = self.centers[-1] if len(self.centers) else -1
+        while self.step():
+            if not self.live and self.position > last:
+                break  # every branch of these centers has halted
+        return self
+
+    def results(self):
+        return {center: branch.result for center, branch in self.branches.items()}
+
+
+def explore_range(task):
+    """Worker: run the branches with centers in [start, stop) to the end"""
+    string, start, stop = task
+    explorer = BranchExplorer(string, range(start, stop))
+    if start > 0:
+        # Branches of later centers only start after their center has been pushed;
+        # the branch of center 0 was already spawned by the constructor
+        while explorer.position < start:
+            explorer.stack = explorer.stack.push(string[explorer.position])
+            explorer.position += 1
+        explorer.spawn()
+    explorer.run()
+    return [(center, branch.result) for center, branch in explorer.branches.items()]
+
+
+def explore(string, workers=None):
+    """Result of every center guess, keyed by center; large inputs use worker processes"""
+    workers = workers or os.cpu_count() or 1
+    n = len(string)
+    if workers == 1 or n < PARALLEL_THRESHOLD:
+        return BranchExplorer(string).run().results()
+    from concurrent.futures import ProcessPoolExecutor  # only paid for by large inputs
+
+    chunk = -(-(n + 1) // workers)
+    tasks = [(string, start, min(start + chunk, n + 1)) for start in range(0, n + 1, chunk)]
+    results = {}
+    with ProcessPoolExecutor(workers) as executor:
+        for pairs in executor.map(explore_range, tasks):
+            results.update(pairs)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Explore every center guess of the palindrome NPDA")
+    parser.add_argument("string")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--all", action="store_true", help="print the result of every branch")
+    args = parser.parse_args(argv)
+    warning = npda.validate(args.string)
+    if warning:
+        parser.error(warning)
+
+    results = explore(args.string, args.workers)
+    accepting = [center for center, result in results.items() if result.accepted]
+    if args.all:
+        for center in sorted(results):
+            print(f"center {center}: {results[center].describe()}")
+    print(f"{len(results)} branches, accepting centers: {accepting or 'none'}")
+    return 0 if accepting else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
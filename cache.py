@@ -0,0 +1,177 @@
+"""Memoized results keyed by a hash of the input string.
+
+A ResultCache keeps the most recently used results in memory and evicts the
+least recently used one once `capacity` is exceeded. With a path it is
+backed by a SQLite file, so results survive restarts: memory misses are
+looked up there, and new or reused entries are written back in batches and
+on close(), after which the file is trimmed to the `capacity` most recently
+used entries as well.
+
+Keys are BLAKE2b digests of a namespace and the string, so entries of
+different machines can share one file and long inputs cost 16 bytes per
+key. Values are JSON-serializable dicts such as npda.Result.as_dict().
+
+    python3 batch.py corpus.txt --cache results.db
+    python3 cache.py results.db
+"""
+import argparse
+import collections
+import hashlib
+import json
+import os
+import sys
+import threading
+
+DEFAULT_CAPACITY = 10000
+FLUSH_EVERY = 1000  # dirty entries written to the file at a time
+
+
+class ResultCache:
+    """LRU cache of results; thread-safe so a pool's feeder thread can use it"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, path=None, namespace="npda"):
+        if capacity < 1:
+            raise ValueError("cache capacity must be positive")
+        self.capacity = capacity
+        self.path = path
+        self.namespace = namespace.encode()
+        self.entries = collections.OrderedDict()  # key -> value, least recently used first
+        self.dirty = set()  # keys whose value or recency is not in the file yet
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.file_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.db = None
+        self.used = 0  # recency counter stored with every entry in the file
+        if path is not None:
+            import sqlite3  # not needed, and not imported, by in-memory caches
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS results "
+                            "(key BLOB PRIMARY KEY, value TEXT NOT NULL, used INTEGER NOT NULL)")
+            self.used = self.db.execute("SELECT COALESCE(MAX(used), 0) FROM results").fetchone()[0]
+
+    def key(self, string):
+        digest = hashlib.blake2b(self.namespace + b"\0", digest_size=16)
+        digest.update(string.encode())
+        return digest.digest()
+
+    def get(self, string):
+        """Cached value for string, or None"""
+        key = self.key(string)
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                self.dirty.add(key)
+                self.hits += 1
+                return value
+            if self.db is not None:
+                row = self.db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._insert(key, value)
+                    self.file_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, string, value):
+        with self.lock:
+            self._insert(self.key(string), value)
+
+    def _insert(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        self.dirty.add(key)
+        if len(self.entries) > self.capacity:
+            evicted, evicted_value = self.entries.popitem(last=False)
+            self.evictions += 1
+            if evicted in self.dirty:
+                # Still written back, so the file keeps more than memory does
+                self._write([(evicted, evicted_value)])
+                self.dirty.discard(evicted)
+        if len(self.dirty) >= FLUSH_EVERY:
+            self._flush()
+
+    def _write(self, items):
+        if self.db is None:
+            return
+        rows = []
+        for key, value in items:
+            self.used += 1
+            rows.append((key, json.dumps(value), self.used))
+        self.db.executemany("INSERT OR REPLACE INTO results (key, value, used) VALUES (?, ?, ?)", rows)
+
+    def _flush(self):
+        # Least recently used first, so the file keeps the memory's recency order
+        self._write([(key, value) for key, value in self.entries.items() if key in self.dirty])
+        self.dirty.clear()
+        if self.db is not None:
+            self.db.execute("DELETE FROM results WHERE used <= ?", (self.used - self.capacity,))
+            self.db.commit()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.dirty.clear()
+            if self.db is not None:
+                self.db.execute("DELETE FROM results")
+                self.db.commit()
+
+    def close(self):
+        if self.db is not None:
+            self.flush()
+            self.db.close()
+            self.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        lookups = self.hits + self.file_hits + self.misses
+        return {"hits": self.hits, "file_hits": self.file_hits, "misses": self.misses,
+                "evictions": self.evictions, "size": len(self.entries), "capacity": self.capacity,
+                "hit_rate": (self.hits + self.file_hits) / lookups if lookups else 0.0}
+
+    def describe(self):
+        stats = self.stats()
+        return (f"{stats['hits'] + stats['file_hits']} hits ({stats['file_hits']} from file), "
+                f"{stats['misses']} misses, {stats['evictions']} evictions, "
+                f"{stats['size']}/{stats['capacity']} entries, hit rate {stats['hit_rate']:.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count or clear the entries of a persistent result cache")
+    parser.add_argument("path", help="SQLite cache file")
+    parser.add_argument("--clear", action="store_true", help="delete every stored entry")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path}: no such file")
+
+    import sqlite3
+
+    db = sqlite3.connect(args.path)
+    try:
+        if args.clear:
+            db.execute("DELETE FROM results")
+            db.commit()
+        count, size = db.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM results").fetchone()
+    finally:
+        db.close()
+    print(f"{count} entries, {size} bytes of results")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""Headless export of NPDA runs as SVG/PNG frames and animated GIFs.
+
+The same PDARenderer that draws on the Tk canvas draws on a SceneCanvas,
+which only records the items, so no display is needed. Frames of a run are
+split into ranges rendered in parallel worker processes:
+
+    python3 export.py abba -o frames/ --format svg
+    python3 export.py abba baab -o docs/ --format png --gif
+    python3 export.py --input-file corpus.txt -o snapshots/ --final-only
+
+PNG and GIF output need Pillow (pip3 install pillow); SVG has no
+dependencies. A PNG sequence (frame_00000.png, ...) can be turned into a
+video with e.g. ffmpeg -i frame_%05d.png run.mp4.
+"""
+import argparse
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+import npda
+from renderer import PDARenderer
+from tracefile import record_run
+
+POINTS_TO_PIXELS = 96 / 72
+ARROW_LENGTH = 8
+ARROW_WIDTH = 4
+
+
+class SceneCanvas:
+    """Records the items a renderer creates, mimicking the tk.Canvas methods it uses"""
+
+    def __init__(self, width, height, background="white"):
+        self.width = width
+        self.height = height
+        self.background = background
+        self.items = {}  # id -> [kind, coords, options], in drawing order
+        self.next_id = 1
+
+    def _create(self, kind, *coords, **options):
+        if len(coords) == 1:
+            coords = coords[0]
+        tags = options.get("tags", ())
+        options["tags"] = (tags,) if isinstance(tags, str) else tuple(tags)
+        item = self.next_id
+        self.next_id += 1
+        self.items[item] = [kind, [float(c) for c in coords], options]
+        return item
+
+    def create_line(self, *coords, **options):
+        return self._create("line", *coords, **options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle", *coords, **options)
+
+    def create_oval(self, *coords, **options):
+        return self._create("oval", *coords, **options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", *coords, **options)
+
+    def _find(self, tag_or_id):
+        if tag_or_id == "all":
+            return list(self.items)
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        return [item for item, (_, _, options) in self.items.items() if tag_or_id in options["tags"]]
+
+    def delete(self, *tags_or_ids):
+        for tag_or_id in tags_or_ids:
+            for item in self._find(tag_or_id):
+                del self.items[item]
+
+    def itemconfigure(self, tag_or_id, **options):
+        for item in self._find(tag_or_id):
+            self.items[item][2].update(options)
+
+    def coords(self, tag_or_id, *coords):
+        if len(coords) == 1:
+            coords = coords[0]
+        for item in self._find(tag_or_id):
+            self.items[item][1] = [float(c) for c in coords]
+
+    def find_all(self):
+        return tuple(self.items)
+
+    def visible_items(self):
+        for kind, coords, options in self.items.values():
+            if options.get("state") != "hidden":
+                yield kind, coords, options
+
+
+def font_of(options, default_size=10):
+    family, size, *style = options.get("font", ("Arial", default_size))
+    return family, abs(size) * POINTS_TO_PIXELS, "bold" in style
+
+
+def quadratic_points(points, segments=16):
+    """Tk's smoothed 3-point line: a quadratic Bezier from the first to the last point"""
+    (x0, y0), (x1, y1), (x2, y2) = points
+    result = []
+    for i in range(segments + 1):
+        t = i / segments
+        result.append(((1 - t) ** 2 * x0 + 2 * (1 - t) * t * x1 + t * t * x2,
+                       (1 - t) ** 2 * y0 + 2 * (1 - t) * t * y1 + t * t * y2))
+    return result
+
+
+def line_points(coords, options):
+    points = list(zip(coords[0::2], coords[1::2]))
+    if options.get("smooth") and len(points) == 3:
+        return quadratic_points(points)
+    return points
+
+
+def arrow_head(points):
+    """Triangle at the end of a polyline, as drawn by arrow="last" """
+    (x0, y0), (x1, y1) = points[-2], points[-1]
+    angle = math.atan2(y1 - y0, x1 - x0)
+    base_x = x1 - ARROW_LENGTH * math.cos(angle)
+    base_y = y1 - ARROW_LENGTH * math.sin(angle)
+    dx, dy = ARROW_WIDTH * math.sin(angle), -ARROW_WIDTH * math.cos(angle)
+    return [(x1, y1), (base_x + dx, base_y + dy), (base_x - dx, base_y - dy)]
+
+
+def to_svg(canvas):
+    """Serialize a SceneCanvas as an SVG document"""
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{canvas.width}" height="{canvas.height}" '
+             f'viewBox="0 0 {canvas.width} {canvas.height}">',
+             f'<rect width="100%" height="100%" fill="{canvas.background}"/>']
+
+    for kind, coords, options in canvas.visible_items():
+        width = options.get("width", 1)
+        if kind in ("rectangle", "oval"):
+            x0, y0, x1, y1 = coords
+            fill = options.get("fill") or "none"
+            stroke = options.get("outline", "black") or "none"
+            paint = f'fill="{fill}" stroke="{stroke}" stroke-width="{width}"'
+            if kind == "rectangle":
+                parts.append(f'<rect x="{x0:.1f}" y="{y0:.1f}" width="{x1 - x0:.1f}" '
+                             f'height="{y1 - y0:.1f}" {paint}/>')
+            else:
+                parts.append(f'<ellipse cx="{(x0 + x1) / 2:.1f}" cy="{(y0 + y1) / 2:.1f}" '
+                             f'rx="{(x1 - x0) / 2:.1f}" ry="{(y1 - y0) / 2:.1f}" {paint}/>')
+        elif kind == "line":
+            color = options.get("fill", "black")
+            points = line_points(coords, options)
+            path = " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+            dash = options.get("dash")
+            dash = f' stroke-dasharray="{" ".join(map(str, dash))}"' if dash else ""
+            parts.append(f'<polyline points="{path}" fill="none" stroke="{color}" '
+                         f'stroke-width="{width}"{dash}/>')
+            if options.get("arrow") == "last":
+                head = " ".join(f"{x:.1f},{y:.1f}" for x, y in arrow_head(points))
+                parts.append(f'<polygon points="{head}" fill="{color}"/>')
+        elif kind == "text":
+            text = str(options.get("text", ""))
+            if not text:
+                continue
+            family, size, bold = font_of(options)
+            anchor = {"e": "end", "w": "start"}.get(options.get("anchor"), "middle")
+            lines = text.split("\n")
+            x, y = coords
+            first_y = y - (len(lines) - 1) * size * 1.2 / 2
+            spans = "".join(f'<tspan x="{x:.1f}" y="{first_y + i * size * 1.2:.1f}">{escape(line)}</tspan>'
+                            for i, line in enumerate(lines))
+            parts.append(f'<text font-family="{family}" font-size="{size:.1f}" '
+                         f'font-weight="{"bold" if bold else "normal"}" text-anchor="{anchor}" '
+                         f'dominant-baseline="central" fill="{options.get("fill", "black")}">{spans}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def require_pillow():
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        raise SystemExit("PNG and GIF export need Pillow: pip3 install pillow")
+    return Image, ImageDraw, ImageFont
+
+
+def to_image(canvas):
+    """Rasterize a SceneCanvas with Pillow"""
+    Image, ImageDraw, ImageFont = require_pillow()
+    image = Image.new("RGB", (canvas.width, canvas.height), canvas.background)
+    draw = ImageDraw.Draw(image)
+    fonts = {}
+
+    def font(options):
+        family, size, bold = font_of(options)
+        key = (round(size), bold)
+        if key not in fonts:
+            name = "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf"
+            try:
+                fonts[key] = ImageFont.truetype(name, key[0])
+            except OSError:
+                fonts[key] = ImageFont.load_default()
+        return fonts[key]
+
+    for kind, coords, options in canvas.visible_items():
+        width = int(options.get("width", 1))
+        if kind in ("rectangle", "oval"):
+            shape = draw.rectangle if kind == "rectangle" else draw.ellipse
+            shape(coords, fill=options.get("fill") or None,
+                  outline=options.get("outline", "black") or None, width=width)
+        elif kind == "line":
+            color = options.get("fill", "black")
+            points = line_points(coords, options)
+            dash = options.get("dash")
+            if dash:
+                # Draw the dash pattern along each straight segment
+                on, off = dash[0], dash[1]
+                for (x0, y0), (x1, y1) in zip(points, points[1:]):
+                    length = math.hypot(x1 - x0, y1 - y0)
+                    t = 0.0
+                    while t < length:
+                        end = min(t + on, length)
+                        draw.line([(x0 + (x1 - x0) * t / length, y0 + (y1 - y0) * t / length),
+                                   (x0 + (x1 - x0) * end / length, y0 + (y1 - y0) * end / length)],
+                                  fill=color, width=width)
+                        t = end + off
+            else:
+                draw.line(points, fill=color, width=width)
+            if options.get("arrow") == "last":
+                draw.polygon(arrow_head(points), fill=color)
+        elif kind == "text":
+            text = str(options.get("text", ""))
+            if text:
+                anchor = {"e": "rm", "w": "lm"}.get(options.get("anchor"), "mm")
+                draw.multiline_text(tuple(coords), text, fill=options.get("fill", "black"),
+                                    font=font(options), anchor=anchor, align="center")
+    return image
+
+
+def render_frames(task):
+    """Worker: render frames [start, stop) of a run; returns the written paths"""
+    string, center, start, stop, directory, fmt, size = task
+    trace = record_run(string, center)
+    width, height = size
+    canvas = SceneCanvas(width, height)
+    renderer = PDARenderer(canvas)
+    paths = []
+    for step in range(start, stop):
+        config = trace.configuration_at(step)
+        renderer.render(width, height, config.state, string, config.position, config.stack)
+        path = os.path.join(directory, f"frame_{step:05d}.{fmt}")
+        if fmt == "svg":
+            with open(path, "w", encoding="utf-8") as output:
+                output.write(to_svg(canvas))
+        else:
+            to_image(canvas).save(path)
+        paths.append(path)
+    return paths
+
+
+def frame_tasks(string, directory, fmt="svg", size=(1000, 400), center=None,
+                final_only=False, workers=None):
+    """Create `directory` and split the frames of one run into render_frames tasks"""
+    os.makedirs(directory, exist_ok=True)
+    steps = record_run(string, center).steps
+    if final_only:
+        ranges = [(steps, steps + 1)]
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunk = max(1, math.ceil((steps + 1) / workers))
+        ranges = [(start, min(start + chunk, steps + 1)) for start in range(0, steps + 1, chunk)]
+    return [(string, center, start, stop, directory, fmt, size) for start, stop in ranges]
+
+
+def export_run(string, directory, fmt="svg", size=(1000, 400), center=None,
+               final_only=False, workers=None, executor=None):
+    """Write the frames of one run to `directory`, rendering ranges in parallel"""
+    tasks = frame_tasks(string, directory, fmt, size, center, final_only, workers)
+    results = map(render_frames, tasks) if executor is None else executor.map(render_frames, tasks)
+    return [path for paths in results for path in paths]
+
+
+def write_gif(paths, output, frame_ms=500):
+    Image, _, _ = require_pillow()
+    frames = [Image.open(path) for path in paths]
+    frames[0].save(output, save_all=True, append_images=frames[1:], duration=frame_ms, loop=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render NPDA runs to SVG/PNG frames without a display")
+    parser.add_argument("strings", nargs="*", help="strings over {a, b} to render")
+    parser.add_argument("--input-file", help="file with one string per line")
+    parser.add_argument("-o", "--output", required=True, help="output directory")
+    parser.add_argument("--format", choices=("svg", "png"), default="svg")
+    parser.add_argument("--size", default="1000x400", help="frame size as WIDTHxHEIGHT")
+    parser.add_argument("--center", type=int, help="symbols pushed before guessing the center")
+    parser.add_argument("--final-only", action="store_true", help="only render the final configuration")
+    parser.add_argument("--gif", action="store_true", help="also write run.gif (PNG format only)")
+    parser.add_argument("--frame-ms", type=int, default=500, help="GIF frame duration")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    strings = list(args.strings)
+    if args.input_file:
+        with open(args.input_file, encoding="utf-8") as lines:
+            strings.extend(line.strip() for line in lines if line.strip())
+    if not strings:
+        parser.error("no strings given")
+    for string in strings:
+        warning = npda.validate(string)
+        if warning:
+            parser.error(f"{string!r}: {warning}")
+    if args.gif and args.format != "png":
+        parser.error("--gif needs --format png")
+    if args.format == "png":
+        require_pillow()
+    width, height = (int(value) for value in args.size.lower().split("x"))
+
+    with ProcessPoolExecutor(args.workers) as executor:
+        # Submit the frames of every string before waiting for any, so the
+        # pool stays busy across strings (and renders --final-only in parallel)
+        runs = []
+        for index, string in enumerate(strings):
+            directory = args.output if len(strings) == 1 else os.path.join(args.output, f"{index:05d}")
+            tasks = frame_tasks(string, directory, args.format, (width, height), args.center,
+                                args.final_only, args.workers)
+            runs.append((string, directory, [executor.submit(render_frames, task) for task in tasks]))
+        for string, directory, futures in runs:
+            paths = [path for future in futures for path in future.result()]
+            if args.gif:
+                write_gif(paths, os.path.join(directory, "run.gif"), args.frame_ms)
+            print(f"{string[:40]}: {len(paths)} frames in {directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
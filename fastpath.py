@@ -0,0 +1,87 @@
+"""Linear-time decision of ww^r membership using Manacher's algorithm.
+
+Simulating the NPDA costs O(n) per guessed center, so trying every guess is
+O(n^2). Manacher's algorithm finds the radius of the even palindrome around
+every center in O(n) total, which tells us directly whether (and where) the
+q0 -> q1 transition leads to acceptance. The visualizer uses this to seed the
+center before animating, and long inputs can be pre-screened with it.
+"""
+import argparse
+import sys
+
+import npda
+
+
+def even_radii(string, progress=None):
+    """Manacher's algorithm for even-length palindromes.
+
+    Returns a list of n + 1 radii where radii[c] is the number of symbols that
+    match on both sides of center c (the center sits after c symbols), i.e. the
+    number of pops the NPDA performs after guessing the center at c.
+    `progress(i, n)` is called every npda.PROGRESS_EVERY centers.
+    """
+    n = len(string)
+    radii = [0] * (n + 1)
+    left, right = 0, -1
+    for i in npda.progress_range(n, progress, 1):
+        k = 0 if i > right else min(radii[left + right - i + 1], right - i + 1)
+        while i + k < n and i - k - 1 >= 0 and string[i + k] == string[i - k - 1]:
+            k += 1
+        radii[i] = k
+        if i + k - 1 > right:
+            left, right = i - k, i + k - 1
+    return radii
+
+
+def accepting_center(string, radii=None):
+    """Return the center at which the NPDA accepts, or None if no guess does"""
+    n = len(string)
+    if n % 2 or not n:
+        return None
+    center = n // 2
+    if radii is None:
+        radii = even_radii(string)
+    return center if radii[center] == center else None
+
+
+def decide(string, radii=None):
+    """Decide membership in O(n), reporting the same result as npda.run"""
+    n = len(string)
+    center = n // 2
+    if not n:
+        return npda.Result(False, npda.EMPTY_INPUT, 0, center=center)
+    if radii is None:
+        radii = even_radii(string)
+    matched = radii[center]
+    position = center + matched
+    if position == n:
+        if matched == center:
+            return npda.Result(True, center=center)
+        return npda.Result(False, npda.STACK_NOT_EMPTY, position, center=center)
+    if matched == center:
+        return npda.Result(False, npda.STACK_EMPTY_EARLY, position, center=center)
+    return npda.Result(False, npda.MISMATCH, position,
+                       string[center - matched - 1], string[position], center)
+
+
+def prescreen(string, progress=None):
+    """Accepting center and verdict from a single pass"""
+    radii = even_radii(string, progress)
+    return accepting_center(string, radii), decide(string, radii)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Linear-time ww^r decision")
+    parser.add_argument("string", help="string over {a, b} to decide")
+    args = parser.parse_args(argv)
+
+    warning = npda.validate(args.string)
+    if warning:
+        parser.error(warning)
+    result = decide(args.string)
+    print(result.describe())
+    return 0 if result.accepted else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
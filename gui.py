@@ -0,0 +1,1006 @@
+"""Tk GUI of the visualizer, started by visualizer.py.
+
+Only this module imports tkinter; the automaton and the command line paths
+of visualizer.py never load it. Modules needed by a single feature (worker
+processes, branch exploration across processes, SQLite) are imported when
+that feature is first used, and widgets that are not shown at first are
+built on first use.
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import math
+import os
+
+import branches
+import cache
+import fastpath
+import machine
+import npda
+from mapped_input import MappedTape
+import profiling
+from renderer import PDARenderer
+from scheduler import FRAME_MS, StepScheduler
+from tracefile import Trace
+
+BACKGROUND_THRESHOLD = 100000  # inputs at least this long are pre-screened and searched in a worker
+
+# Handlers timed by the profiler; "flush_resize" is the coalesced resize redraw
+PROFILED_HANDLERS = ("start_processing", "make_choice", "step_forward", "process_step",
+                     "show_status", "draw_pda", "flush_resize", "auto_step")
+
+class PDAVisualizerApp:
+    def __init__(self, root, result_cache_file=None):
+        self.root = root
+        self.root.title("NPDA Palindrome Visualizer")
+        self.root.geometry("1000x700")
+        self.root.configure(bg="#f0f0f0")
+        
+        # Set style
+        self.style = ttk.Style()
+        self.style.configure("TFrame", background="#f0f0f0")
+        self.style.configure("TButton", font=("Arial", 12), padding=5)
+        self.style.configure("TLabel", font=("Arial", 12), background="#f0f0f0")
+        self.style.configure("Header.TLabel", font=("Arial", 16, "bold"), background="#f0f0f0")
+        self.style.configure("Result.TLabel", font=("Arial", 14), background="#f0f0f0")
+        
+        # Instrument the handlers before any callback is bound to them
+        self.profiler = profiling.Profiler()
+        self.profiler.instrument(self, PROFILED_HANDLERS)
+        
+        # Headless engine holding the configuration; the app only renders it
+        self.engine = npda.PalindromeNPDA()
+        self.machine = None  # machine.Machine loaded from a definition file
+        self.explorer = None  # branches.BranchExplorer while all branches are explored
+        self.mapped = None  # MappedTape of a file opened with "Open File"
+        self.mapped_position = 0
+        # Verdicts of strings decided before, so re-entered strings are not decided again;
+        # with a file they are kept across sessions
+        self.results = cache.ResultCache(path=result_cache_file)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        
+        # Canvas size from the last <Configure> event and the pending resize redraw
+        self.canvas_size = (0, 0)
+        self.pending_redraw = None
+        self.resize_redraws = 0
+        self.resize_redraws_saved = 0
+        
+        # Animation speed
+        self.animation_speed = 1.0  # seconds between transitions
+        
+        # Automatic runs are paced by a scheduler that batches steps per frame
+        self.scheduler = StepScheduler(root, self.auto_step, self.show_configuration,
+                                       self.auto_finished)
+        self.pending_moves = None
+        self.run_center = None
+        self.last_status = npda.CONTINUE
+        
+        # Create UI components
+        self.create_ui()
+        
+        # Initialize NPDA components
+        self.processing = False
+        self.non_deterministic_paths = []  # the explorer's live branches
+        self.current_path_index = 0  # branch of non_deterministic_paths shown on the canvas
+        self.chosen_path = None
+        self.nondeterministic_choice_made = False
+        self.seeded_center = None
+    
+    def create_ui(self):
+        # Main frame
+        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Tools menu with the profiling overlay and session exports
+        menubar = tk.Menu(self.root)
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="Performance Overlay", accelerator="F12",
+                               command=lambda: self.overlay.toggle())
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Start Profiling Session", command=self.start_profiling)
+        tools_menu.add_command(label="Stop Profiling Session", command=self.profiler.stop_session)
+        tools_menu.add_command(label="Export Profile (pstats)...", command=self.export_pstats)
+        tools_menu.add_command(label="Export Chrome Trace...", command=self.export_chrome_trace)
+        tools_menu.add_command(label="Print Handler Summary",
+                               command=lambda: print("\n".join(self.profiler.summary())))
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Print Result Cache Statistics",
+                               command=lambda: print(f"result cache: {self.results.describe()}"))
+        tools_menu.add_command(label="Clear Result Cache", command=lambda: self.results.clear())
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        self.root.configure(menu=menubar)
+        self.root.bind("<F12>", lambda event: self.overlay.toggle())
+        
+        # Title
+        title_label = ttk.Label(main_frame, text="Non-Deterministic PDA (NPDA) for Palindromes i.e L={ww^r | w belongs {a, b}^+ }", 
+                               style="Header.TLabel")
+        title_label.pack(pady=10)
+        
+        # Input frame
+        input_frame = ttk.Frame(main_frame)
+        input_frame.pack(fill=tk.X, pady=10)
+        
+        self.input_prompt = ttk.Label(input_frame, text="Enter a string over {a, b}:")
+        self.input_prompt.pack(side=tk.LEFT, padx=5)
+        self.input_entry = ttk.Entry(input_frame, font=("Arial", 12), width=30)
+        self.input_entry.pack(side=tk.LEFT, padx=5)
+        
+        # Decide without animating, in a background process
+        self.decide_button = ttk.Button(input_frame, text="Decide", command=self.decide_in_background)
+        self.decide_button.pack(side=tk.LEFT, padx=5)
+        
+        # Files too large for the entry are memory-mapped and viewed through the tape window
+        ttk.Button(input_frame, text="Open File", command=self.open_mapped_file).pack(side=tk.LEFT, padx=5)
+        
+        # Other automata can be loaded from JSON/YAML definitions
+        ttk.Button(input_frame, text="Load Machine", command=self.load_machine).pack(side=tk.LEFT, padx=5)
+        ttk.Button(input_frame, text="Palindrome NPDA",
+                   command=lambda: self.use_machine(None)).pack(side=tk.LEFT, padx=5)
+        
+        # Speed control
+        speed_frame = ttk.Frame(input_frame)
+        speed_frame.pack(side=tk.RIGHT, padx=20)
+        ttk.Label(speed_frame, text="Animation Speed:Fast").pack(side=tk.LEFT)
+        # Logarithmic scale from 1 ms to 2 s between transitions
+        self.speed_scale = ttk.Scale(speed_frame, from_=-3.0, to=math.log10(2.0), length=100, 
+                                    orient=tk.HORIZONTAL, value=0.0,
+                                    command=self.update_speed)
+        self.speed_scale.pack(side=tk.LEFT, padx=5)
+        ttk.Label(speed_frame, text="Slow").pack(side=tk.LEFT)
+        self.max_speed = tk.BooleanVar(value=False)
+        ttk.Checkbutton(speed_frame, text="Max Speed", variable=self.max_speed,
+                        command=self.update_speed).pack(side=tk.LEFT, padx=5)
+        
+        # Button frame
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=10)
+        
+        self.start_button = ttk.Button(button_frame, text="Start Processing", 
+                                      command=self.start_processing)
+        self.start_button.pack(side=tk.LEFT, padx=5)
+        
+        self.reset_button = ttk.Button(button_frame, text="Reset", command=self.reset)
+        self.reset_button.pack(side=tk.LEFT, padx=5)
+        
+        self.run_button = ttk.Button(button_frame, text="Run", command=self.toggle_run)
+        self.run_button.pack(side=tk.LEFT, padx=5)
+        
+        self.search_button = ttk.Button(button_frame, text="Find Accepting Path", 
+                                       command=self.find_accepting_path)
+        self.search_button.pack(side=tk.LEFT, padx=5)
+        
+        # Follow every center guess at once; the canvas shows the branch selected here
+        self.explore_button = ttk.Button(button_frame, text="Explore All Branches", 
+                                        command=self.explore_branches)
+        self.explore_button.pack(side=tk.LEFT, padx=5)
+        
+        self.next_branch_button = ttk.Button(button_frame, text="Next Branch", 
+                                            command=self.next_branch, state=tk.DISABLED)
+        self.next_branch_button.pack(side=tk.LEFT, padx=5)
+        
+        # Button frames for different states
+        self.q0_frame = ttk.Frame(button_frame)
+        self.q0_frame.pack(side=tk.LEFT, padx=5)
+        
+        self.continue_push_button = ttk.Button(self.q0_frame, text="Continue Pushing", 
+                                             command=lambda: self.make_choice(False), state=tk.DISABLED)
+        self.continue_push_button.pack(side=tk.LEFT, padx=5)
+        
+        self.start_matching_button = ttk.Button(self.q0_frame, text="Select Center", 
+                                              command=lambda: self.make_choice(True), state=tk.DISABLED)
+        self.start_matching_button.pack(side=tk.LEFT, padx=5)
+        
+        self.q1_frame = ttk.Frame(button_frame)
+        self.q1_frame.pack(side=tk.LEFT, padx=5)
+        
+        self.step_button = ttk.Button(self.q1_frame, text="Continue Popping", 
+                                     command=self.step_forward, state=tk.DISABLED)
+        self.step_button.pack(side=tk.LEFT, padx=5)
+        
+        # Let the linear-time pre-screen take the q0 -> q1 transition at the right position
+        self.auto_center = tk.BooleanVar(value=True)
+        ttk.Checkbutton(button_frame, text="Auto-select Center", 
+                        variable=self.auto_center).pack(side=tk.LEFT, padx=5)
+        
+        # Canvas for PDA visualization
+        self.canvas_frame = ttk.Frame(main_frame, borderwidth=2, relief=tk.GROOVE)
+        self.canvas_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        
+        self.canvas = tk.Canvas(self.canvas_frame, bg="white", height=400)
+        self.canvas.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.renderer = PDARenderer(self.canvas)
+        self.profiler.watch_canvas(self.canvas)
+        self.overlay = profiling.ProfilerOverlay(self.root, self.canvas, self.profiler)
+        
+        # Scroll the tape window with the mouse wheel, zoom with Ctrl+wheel, jump on the minimap
+        self.canvas.bind("<MouseWheel>", self.on_tape_wheel)
+        self.canvas.bind("<Button-4>", self.on_tape_wheel)
+        self.canvas.bind("<Button-5>", self.on_tape_wheel)
+        self.canvas.bind("<Configure>", self.on_canvas_configure)
+        self.canvas.tag_bind("minimap", "<Button-1>", lambda event: self.renderer.scroll_to(event.x))
+        
+        # Timeline of the recorded trace: scrub to any step or step backwards
+        timeline_frame = ttk.Frame(main_frame)
+        timeline_frame.pack(fill=tk.X)
+        
+        self.back_button = ttk.Button(timeline_frame, text="Step Back", command=self.step_back)
+        self.back_button.pack(side=tk.LEFT, padx=5)
+        
+        self.updating_timeline = False
+        self.timeline = ttk.Scale(timeline_frame, from_=0, to=1, orient=tk.HORIZONTAL,
+                                  command=self.on_timeline)
+        self.timeline.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        self.timeline_label = ttk.Label(timeline_frame, text="Step 0 / 0")
+        self.timeline_label.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(timeline_frame, text="Save Trace", command=self.save_trace).pack(side=tk.LEFT, padx=5)
+        ttk.Button(timeline_frame, text="Load Trace", command=self.load_trace).pack(side=tk.LEFT, padx=5)
+        
+        # Status and result frame
+        status_frame = ttk.Frame(main_frame)
+        status_frame.pack(fill=tk.X, pady=10)
+        
+        self.current_input_label = ttk.Label(status_frame, text="Current Input: ")
+        self.current_input_label.pack(anchor=tk.W, pady=2)
+        
+        self.current_state_label = ttk.Label(status_frame, text="Current State: q0")
+        self.current_state_label.pack(anchor=tk.W, pady=2)
+        
+        self.stack_label = ttk.Label(status_frame, text="Stack: []")
+        self.stack_label.pack(anchor=tk.W, pady=2)
+        
+        self.result_label = ttk.Label(status_frame, text="Result: ", style="Result.TLabel")
+        self.result_label.pack(anchor=tk.W, pady=5)
+        
+        self.redraw_label = ttk.Label(status_frame, text="", font=("Arial", 9), foreground="gray")
+        self.redraw_label.pack(anchor=tk.W)
+        
+        # Panels below are built the first time they are shown
+        self.status_frame = status_frame
+        self.job = None
+        self.job_frame = None  # progress of a background job
+        self.result_panel = None  # non-modal result panel in place of result popups
+        self.mapped_frame = None  # position of the tape window on a memory-mapped file
+        
+        # The long description is filled in once the window is up; the canvas is
+        # drawn by its first <Configure> event
+        self.main_frame = main_frame
+        self.description_label = None
+        self.root.after_idle(self.build_description)
+    
+    def build_description(self):
+        desc_frame = ttk.Frame(self.main_frame, borderwidth=2, relief=tk.GROOVE)
+        desc_frame.pack(fill=tk.X, pady=10)
+        
+        self.description_label = ttk.Label(desc_frame, text=self.description(), justify=tk.LEFT, 
+                                           padding=10)
+        self.description_label.pack(fill=tk.X)
+    
+    def build_job_frame(self):
+        self.job_frame = ttk.Frame(self.status_frame)
+        self.job_label = ttk.Label(self.job_frame, text="")
+        self.job_label.pack(side=tk.LEFT, padx=5)
+        self.job_progress = ttk.Progressbar(self.job_frame, length=300, maximum=100)
+        self.job_progress.pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.job_frame, text="Cancel", command=self.cancel_job).pack(side=tk.LEFT, padx=5)
+    
+    def build_result_panel(self):
+        self.result_panel = tk.Frame(self.status_frame, borderwidth=2, relief=tk.GROOVE)
+        self.result_headline = tk.Label(self.result_panel, text="", font=("Arial", 13, "bold"))
+        self.result_headline.pack(side=tk.LEFT, padx=10, pady=5)
+        self.result_detail = tk.Label(self.result_panel, text="", font=("Arial", 11))
+        self.result_detail.pack(side=tk.LEFT, padx=10, pady=5)
+        ttk.Button(self.result_panel, text="Dismiss",
+                   command=self.result_panel.pack_forget).pack(side=tk.RIGHT, padx=5)
+    
+    def build_mapped_frame(self):
+        self.mapped_frame = ttk.Frame(self.status_frame)
+        ttk.Label(self.mapped_frame, text="Show position:").pack(side=tk.LEFT, padx=5)
+        self.position_entry = ttk.Entry(self.mapped_frame, width=16)
+        self.position_entry.pack(side=tk.LEFT, padx=5)
+        self.position_entry.bind("<Return>", lambda event: self.show_mapped_position())
+        ttk.Button(self.mapped_frame, text="Go", command=self.show_mapped_position).pack(side=tk.LEFT, padx=5)
+    
+    def description(self):
+        if self.machine is None:
+            return (
+                "Non-Deterministic Push Down Automata for Palindromes over L = {a, b}\n"
+                "States: q0 (pushing), q1 (matching), q2 (accepting)\n"
+                "Transitions:\n"
+            ) + "\n".join(npda.describe_transitions())
+        m = self.machine
+        accepting = "final state" if m.accept_by == machine.FINAL_STATE else "empty stack"
+        return (
+            f"{m.name} (all branches are followed at once)\n"
+            f"States: {', '.join(m.states)}, start {m.start}, accepting by {accepting}\n"
+            "Transitions:\n"
+        ) + "\n".join(m.describe_transitions())
+    
+    def load_machine(self):
+        path = filedialog.askopenfilename(filetypes=[("PDA definitions", "*.json *.yaml *.yml"),
+                                                     ("All files", "*")])
+        if not path:
+            return
+        try:
+            loaded = machine.load_machine(path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Load Machine", str(error))
+            return
+        self.use_machine(loaded)
+    
+    def use_machine(self, loaded):
+        """Switch to a loaded machine, or back to the palindrome NPDA for None"""
+        self.scheduler.stop()
+        self.machine = loaded
+        if loaded is None:
+            self.engine = npda.PalindromeNPDA()
+            alphabet = "a, b"
+        else:
+            self.engine = machine.MachineRun(loaded)
+            alphabet = ", ".join(loaded.alphabet)
+        self.input_prompt.configure(text=f"Enter a string over {{{alphabet}}}:")
+        if self.description_label is not None:
+            self.description_label.configure(text=self.description())
+        self.renderer.set_machine(loaded)
+        self.reset()
+    
+    # Read-only views of the engine's configuration used while drawing
+    @property
+    def input_string(self):
+        return self.engine.input_string
+    
+    @property
+    def current_state(self):
+        return self.engine.state
+    
+    @property
+    def input_position(self):
+        return self.engine.position
+    
+    @property
+    def stack(self):
+        return self.engine.stack
+    
+    def on_tape_wheel(self, event):
+        backwards = event.num == 4 or event.delta > 0
+        if event.state & 0x4:  # Control key held
+            self.renderer.zoom(1.25 if backwards else 0.8)
+        else:
+            self.renderer.scroll_tape(-5 if backwards else 5)
+    
+    def update_speed(self, value=None):
+        self.animation_speed = 10 ** float(self.speed_scale.get())
+        self.scheduler.set_rate(1 / self.animation_speed, self.max_speed.get())
+    
+    def on_canvas_configure(self, event):
+        """Coalesce resize events into at most one redraw per frame"""
+        size = (event.width, event.height)
+        if size == self.canvas_size or self.pending_redraw is not None:
+            self.canvas_size = size
+            self.resize_redraws_saved += 1
+            return
+        self.canvas_size = size
+        self.pending_redraw = self.root.after(FRAME_MS, self.flush_resize)
+    
+    def flush_resize(self):
+        self.pending_redraw = None
+        self.resize_redraws += 1
+        self.draw_pda()
+        self.redraw_label.configure(
+            text=f"Resize redraws: {self.resize_redraws} ({self.resize_redraws_saved} coalesced)")
+    
+    def draw_pda(self):
+        width, height = self.canvas_size
+        
+        # The canvas is not mapped yet; its first <Configure> event draws it
+        if width < 50 or height < 50:
+            return
+        
+        # Only the items affected by the last step are updated
+        if self.explorer is not None:
+            state, position, stack = self.branch_configuration()
+            self.renderer.render(width, height, state, self.explorer.string, position, stack)
+            self.renderer.update_branches(self.explorer, self.selected_branch_center())
+            return
+        if self.mapped is not None:
+            self.renderer.render(width, height, self.current_state, self.mapped, self.mapped_position,
+                                 self.stack)
+            return
+        self.renderer.render(width, height, self.current_state, self.input_string,
+                             self.input_position, self.stack)
+
+    def explore_branches(self):
+        """Simulate every center guess in lockstep, pruning branches as they fail"""
+        input_string = self.input_entry.get().strip()
+        warning = npda.validate(input_string)
+        if warning:
+            messagebox.showwarning("Invalid Input", warning)
+            return
+        
+        self.reset()
+        self.explorer = branches.BranchExplorer(input_string)
+        self.non_deterministic_paths = self.explorer.live
+        self.current_path_index = 0
+        self.processing = True
+        self.start_button.configure(state=tk.DISABLED)
+        self.current_input_label.configure(text=f"Current Input: {self.short_input(input_string)}")
+        self.result_label.configure(text="Result: Exploring all branches...")
+        self.show_configuration()
+    
+    def selected_branch(self):
+        paths = self.non_deterministic_paths
+        return paths[self.current_path_index % len(paths)] if paths else None
+    
+    def selected_branch_center(self):
+        branch = self.selected_branch()
+        return branch.center if branch is not None else None
+    
+    def branch_configuration(self):
+        """State, position and stack of the branch shown while exploring"""
+        explorer = self.explorer
+        position = min(explorer.position, len(explorer.string))
+        branch = self.selected_branch()
+        if branch is not None:
+            return branch.state, position, branch.stack
+        if explorer.accepted:
+            return npda.Q2, position, branches.SharedStack()
+        # No branch is matching: show the pushing branch
+        return npda.Q0 if not explorer.done else npda.Q1, position, explorer.stack
+    
+    def next_branch(self):
+        if self.non_deterministic_paths:
+            self.current_path_index = (self.current_path_index + 1) % len(self.non_deterministic_paths)
+            self.show_configuration()
+    
+    def step_explorer(self):
+        """Advance every live branch by one symbol; returns False once all have halted"""
+        selected = self.selected_branch()
+        alive = self.explorer.step()
+        paths = self.non_deterministic_paths = self.explorer.live
+        # Keep showing the same branch while it survives
+        if selected is not None and selected.alive and selected in paths:
+            self.current_path_index = paths.index(selected)
+        elif paths:
+            self.current_path_index %= len(paths)
+        if not alive:
+            self.processing = False
+        return alive
+    
+    def explorer_finished(self):
+        accepted = self.explorer.accepted
+        if accepted:
+            text = f"Accepted (branch with center after {accepted[0]} symbols survives)"
+        else:
+            text = f"Rejected (all {len(self.explorer.branches)} branches were pruned)"
+        self.result_label.configure(text=f"Result: {text}")
+        self.show_configuration()
+    
+    # Background jobs and results
+    def short_input(self, string=None):
+        string = self.input_string if string is None else string
+        return string if len(string) <= 40 else f"{string[:40]}… ({len(string)} symbols)"
+    
+    def show_result(self, accepted, headline, detail=""):
+        """Report a verdict in the result panel without blocking the event loop"""
+        color = "#1a7f1a" if accepted else "#b00020"
+        if self.result_panel is None:
+            self.build_result_panel()
+        self.result_headline.configure(text=headline, foreground=color)
+        self.result_detail.configure(text=detail)
+        self.result_panel.pack(fill=tk.X, pady=5)
+    
+    def hide_result(self):
+        if self.result_panel is not None:
+            self.result_panel.pack_forget()
+    
+    def run_job(self, task, input_string, on_result, description):
+        """Start a worker.BackgroundJob and poll it from the event loop"""
+        from worker import BackgroundJob  # multiprocessing is only loaded for the first job
+        
+        self.cancel_job()
+        if self.job_frame is None:
+            self.build_job_frame()
+        self.job = BackgroundJob(task, input_string)
+        self.job.on_result = on_result
+        self.job.description = description
+        self.job_label.configure(text=f"{description}...")
+        self.job_progress.configure(value=0)
+        self.job_frame.pack(fill=tk.X, pady=5)
+        self.root.after(FRAME_MS, self.poll_job, self.job)
+    
+    def poll_job(self, job):
+        if job is not self.job:
+            return  # replaced or cancelled
+        for message in job.poll():
+            kind = message[0]
+            if kind == "progress":
+                done, total = message[1:]
+                self.job_progress.configure(value=100 * done / max(total, 1))
+                self.job_label.configure(text=f"{job.description}... {done:,} / {total:,}")
+            elif kind == "result":
+                self.finish_job()
+                job.on_result(message[1])
+            elif kind == "error":
+                self.finish_job()
+                self.show_result(False, "Error", message[1])
+        if not job.finished:
+            self.root.after(FRAME_MS, self.poll_job, job)
+    
+    def finish_job(self):
+        self.job = None
+        if self.job_frame is not None:
+            self.job_frame.pack_forget()
+    
+    def cancel_job(self):
+        job = self.job
+        if job is not None:
+            job.cancel()
+            # Poll the cancelled job until it stops, but forget its result
+            job.on_result = lambda value: None
+            self.finish_job()
+            self.result_label.configure(text=f"Result: {job.description} cancelled")
+            self.root.after(FRAME_MS, self.drain_job, job)
+    
+    def drain_job(self, job):
+        job.poll()
+        if not job.finished:
+            self.root.after(FRAME_MS, self.drain_job, job)
+    
+    def remember(self, input_string, result):
+        self.results.put(input_string, result.as_dict())
+    
+    def recall(self, input_string):
+        """npda.Result of a string decided before, or None"""
+        cached = self.results.get(input_string)
+        return npda.Result(**cached) if cached is not None else None
+    
+    def decide_in_background(self):
+        input_string = self.input_entry.get().strip()
+        warning = npda.validate(input_string)
+        if warning:
+            messagebox.showwarning("Invalid Input", warning)
+            return
+        self.hide_result()
+        cached = self.recall(input_string)
+        if cached is not None:
+            self.decided(cached, cached=True)
+            return
+        self.run_job("decide", input_string, lambda result: self.decided(result, input_string),
+                     f"Deciding {len(input_string):,} symbols")
+    
+    def decided(self, result, input_string=None, cached=False):
+        if input_string is not None:
+            self.remember(input_string, result)
+        headline = result.describe() + (" (cached)" if cached else "")
+        self.result_label.configure(text=f"Result: {headline}")
+        self.show_result(result.accepted, headline, self.result_detail_text(result))
+    
+    def result_detail_text(self, result):
+        if result.accepted:
+            return "The string is a valid palindrome."
+        if result.reason == npda.MISMATCH:
+            return (f"Mismatch at position {result.position}: "
+                    f"expected '{result.expected}' but got '{result.got}'")
+        if result.reason == npda.STACK_EMPTY_EARLY:
+            return "Stack became empty before finishing the input processing."
+        if result.reason == npda.EMPTY_INPUT:
+            return "The empty string is not of the form ww^r with w non-empty."
+        return "Stack not empty after input processed"
+    
+    def start_processing(self, input_string=None):
+        if input_string is None:
+            input_string = self.input_entry.get().strip()
+        
+        # Validate input
+        warning = (self.machine or npda).validate(input_string)
+        if warning:
+            messagebox.showwarning("Invalid Input", warning)
+            return
+        
+        # Initialize PDA and record every move
+        self.reset()
+        self.engine.load(input_string)
+        self.processing = True
+        self.start_button.configure(state=tk.DISABLED)
+        self.current_input_label.configure(text=f"Current Input: {self.short_input()}")
+        if self.machine is not None:
+            self.result_label.configure(text="Result: Processing...")
+            self.show_configuration()
+            return
+        self.engine.trace = Trace(input_string)
+        
+        # Pre-screen the input in O(n) to find where the center has to be guessed;
+        # long inputs are pre-screened in the background while stepping already works
+        cached = self.recall(input_string)
+        if cached is not None:
+            self.prescreened((cached.center if cached.accepted else None, None), cached=True)
+        elif len(input_string) >= BACKGROUND_THRESHOLD:
+            self.result_label.configure(text="Result: Processing... (pre-screen running)")
+            self.run_job("prescreen", input_string, self.prescreened, "Pre-screening")
+        else:
+            self.prescreened(fastpath.prescreen(input_string))
+        
+        # In q0 initially, enable only push and select center buttons
+        self.update_buttons()
+        self.draw_pda()
+    
+    def prescreened(self, outcome, cached=False):
+        self.seeded_center, result = outcome
+        if result is not None:
+            self.remember(self.input_string, result)
+        if self.seeded_center is None:
+            verdict = "no center leads to acceptance"
+        else:
+            verdict = f"accepted with center after {self.seeded_center} symbols"
+        if cached:
+            verdict += ", cached"
+        if self.processing:
+            self.result_label.configure(text=f"Result: Processing... (pre-screen: {verdict})")
+    
+    # Memory-mapped input files
+    def open_mapped_file(self):
+        path = filedialog.askopenfilename(filetypes=[("Text files", "*.txt"), ("All files", "*")])
+        if not path:
+            return
+        self.reset()
+        try:
+            tape = MappedTape(path)
+        except OSError as error:
+            messagebox.showerror("Open File", str(error))
+            return
+        self.mapped = tape
+        self.mapped_position = 0
+        name = os.path.basename(path)
+        self.current_input_label.configure(
+            text=f"Current Input: {name} ({len(tape):,} symbols, memory-mapped)")
+        if self.mapped_frame is None:
+            self.build_mapped_frame()
+        self.position_entry.delete(0, tk.END)
+        self.position_entry.insert(0, "0")
+        self.mapped_frame.pack(anchor=tk.W, pady=2)
+        self.draw_pda()
+        self.run_job("mapped", path, self.mapped_decided, f"Deciding {name}")
+    
+    def mapped_decided(self, result):
+        self.decided(result)
+        if not result.accepted:
+            self.show_mapped_position(result.position)
+    
+    def show_mapped_position(self, position=None):
+        """Center the tape window of the mapped file on a position"""
+        if self.mapped is None:
+            return
+        if position is None:
+            try:
+                position = int(self.position_entry.get().replace(",", "").replace("_", ""))
+            except ValueError:
+                position = -1
+            if not 0 <= position < len(self.mapped):
+                messagebox.showwarning("Show Position",
+                                       f"Enter a position from 0 to {len(self.mapped) - 1:,}.")
+                return
+        self.mapped_position = position
+        self.position_entry.delete(0, tk.END)
+        self.position_entry.insert(0, str(position))
+        self.draw_pda()
+        self.renderer.center_on(position)
+    
+    def close_mapped_file(self):
+        if self.mapped is not None:
+            tape, self.mapped = self.mapped, None
+            self.mapped_frame.pack_forget()
+            # The renderer still shows the tape until the next draw replaces it
+            self.draw_pda()
+            tape.close()
+    
+    def close(self):
+        """Write the result cache back before the window goes away"""
+        self.cancel_job()
+        self.close_mapped_file()
+        self.results.close()
+        self.root.destroy()
+    
+    def reset(self):
+        # Stop any automatic run and background job
+        self.scheduler.stop()
+        self.cancel_job()
+        self.hide_result()
+        self.pending_moves = None
+        self.close_mapped_file()
+        self.run_button.configure(text="Run")
+        
+        # Reset PDA state
+        self.engine.load("")
+        self.explorer = None
+        self.non_deterministic_paths = []
+        self.current_path_index = 0
+        self.processing = False
+        self.nondeterministic_choice_made = False
+        self.seeded_center = None
+        
+        # Reset UI
+        self.result_label.configure(text="Result: ")
+        self.current_state_label.configure(text=f"Current State: {self.current_state}")
+        self.stack_label.configure(text="Stack: []")
+        self.current_input_label.configure(text="Current Input: ")
+        
+        # Reset button states
+        self.start_button.configure(state=tk.NORMAL)
+        self.update_buttons()
+        self.update_timeline()
+        
+        # Redraw PDA
+        self.draw_pda()
+    
+    def update_buttons(self):
+        """Enable the controls that match the engine's current state"""
+        # A loaded machine has no center to choose; it is only stepped
+        builtin = self.machine is None
+        exploring = self.explorer is not None
+        in_q0 = self.processing and builtin and not exploring and self.current_state == npda.Q0
+        in_q1 = self.processing and (not builtin or exploring or self.current_state == npda.Q1)
+        self.continue_push_button.configure(state=tk.NORMAL if in_q0 else tk.DISABLED)
+        self.start_matching_button.configure(state=tk.NORMAL if in_q0 else tk.DISABLED)
+        self.step_button.configure(state=tk.NORMAL if in_q1 else tk.DISABLED)
+        self.search_button.configure(state=tk.NORMAL if builtin else tk.DISABLED)
+        self.decide_button.configure(state=tk.NORMAL if builtin else tk.DISABLED)
+        self.explore_button.configure(state=tk.NORMAL if builtin else tk.DISABLED)
+        self.next_branch_button.configure(
+            state=tk.NORMAL if len(self.non_deterministic_paths) > 1 else tk.DISABLED)
+    
+    def make_choice(self, start_matching):
+        """Handle the non-deterministic choice at state q0"""
+        self.nondeterministic_choice_made = True
+        
+        if start_matching:
+            # Transition to matching state q1
+            self.engine.choose_center()
+            # Redraw to show the state transition
+            self.show_configuration()
+            return
+        
+        # else: stay in q0 and continue pushing
+        self.process_step()
+        
+        # Take the seeded center automatically once the pushing phase reaches it
+        if (self.auto_center.get() and self.processing and self.current_state == npda.Q0
+                and self.input_position == self.seeded_center):
+            self.make_choice(True)
+    
+    def find_accepting_path(self):
+        """Explore every center guess and replay the first accepting branch"""
+        input_string = self.input_entry.get().strip()
+        warning = npda.validate(input_string)
+        if warning:
+            messagebox.showwarning("Invalid Input", warning)
+            return
+        
+        # A string known to be rejected has no path to replay
+        cached = self.recall(input_string)
+        if cached is not None and not cached.accepted:
+            self.replay_search(npda.SearchResult(False), input_string, cached=True)
+        elif len(input_string) >= BACKGROUND_THRESHOLD:
+            # The entry may be edited while the search runs; replay the string that was searched
+            self.run_job("search", input_string, lambda search: self.replay_search(search, input_string),
+                         "Searching for an accepting path")
+        else:
+            self.replay_search(npda.search(input_string), input_string)
+    
+    def replay_search(self, search, input_string, cached=False):
+        if not search.accepted:
+            self.reset()
+            explored = "cached" if cached else f"{search.explored} configurations explored"
+            self.result_label.configure(text=f"Result: Rejected (No branch accepts, {explored})")
+            self.show_result(False, f"'{self.short_input(input_string)}' is NOT a valid palindrome!",
+                             "None of the center guesses leads to acceptance.")
+            return
+        
+        self.start_processing(input_string)
+        if not self.processing:
+            return
+        self.result_label.configure(
+            text=f"Result: Replaying accepting path (center after {search.center} symbols)")
+        self.pending_moves = iter(search.path)
+        self.start_run()
+    
+    def toggle_run(self):
+        """Run the rest of the input automatically, or pause a running animation"""
+        if self.scheduler.running:
+            self.scheduler.stop()
+            self.run_button.configure(text="Run")
+            return
+        if not self.processing:
+            self.start_processing()
+            if not self.processing:
+                return
+        self.start_run()
+    
+    def start_run(self):
+        # Guess the center where the pre-screen found it, or in the middle
+        self.run_center = self.seeded_center
+        if self.run_center is None:
+            self.run_center = len(self.input_string) // 2
+        self.run_button.configure(text="Pause")
+        self.update_speed()
+        self.scheduler.start()
+    
+    def auto_step(self):
+        """One automaton move for the scheduler; returns False once the run halted"""
+        if self.explorer is not None:
+            return self.step_explorer()
+        if self.pending_moves is not None:
+            move = next(self.pending_moves, None)
+            guess = move == npda.GUESS_CENTER
+        else:
+            guess = (self.machine is None and self.current_state == npda.Q0
+                     and self.input_position == self.run_center)
+        if guess:
+            self.engine.choose_center()
+            return True
+        self.last_status = self.engine.step()
+        return self.last_status == npda.CONTINUE
+    
+    def auto_finished(self):
+        self.pending_moves = None
+        self.run_button.configure(text="Run")
+        if self.explorer is not None:
+            self.explorer_finished()
+            return
+        self.show_status(self.last_status)
+    
+    def step_forward(self):
+        if not self.processing:
+            return
+        
+        if self.explorer is not None:
+            if not self.step_explorer():
+                self.explorer_finished()
+                return
+            self.show_configuration()
+            return
+            
+        # Process just one step
+        if (self.machine is not None or self.current_state != npda.Q0
+                or self.nondeterministic_choice_made):
+            self.process_step()
+    
+    def process_step(self):
+        status = self.engine.step()
+        
+        # Reset the choice flag after each push operation
+        self.nondeterministic_choice_made = False
+        
+        self.show_status(status)
+        return status
+    
+    def show_configuration(self):
+        """Update the labels, buttons and canvas for the engine's configuration"""
+        if self.explorer is not None:
+            state, _, stack = self.branch_configuration()
+            center = self.selected_branch_center()
+            shown = f"branch with center {center}" if center is not None else "no branch matching"
+            self.current_state_label.configure(
+                text=f"Current State: {state} ({shown}, {self.explorer.live_count} live)")
+            self.stack_label.configure(text=f"Stack: {stack.summary()}")
+        else:
+            self.current_state_label.configure(text=f"Current State: {self.current_state}")
+            self.stack_label.configure(text=f"Stack: {self.stack.summary()}")
+        self.update_buttons()
+        self.update_timeline()
+        self.draw_pda()
+    
+    def update_timeline(self):
+        trace = self.engine.trace
+        steps, cursor = (trace.steps, trace.cursor) if trace else (0, 0)
+        # Setting the value calls on_timeline; ignore that call
+        self.updating_timeline = True
+        self.timeline.configure(to=max(steps, 1))
+        self.timeline.set(cursor)
+        self.updating_timeline = False
+        self.timeline_label.configure(text=f"Step {cursor} / {steps}")
+        self.back_button.configure(state=tk.NORMAL if cursor else tk.DISABLED)
+    
+    def on_timeline(self, value):
+        if self.updating_timeline or self.engine.trace is None:
+            return
+        step = round(float(value))
+        if step != self.engine.trace.cursor:
+            self.seek(step)
+    
+    def step_back(self):
+        if self.engine.trace is not None and self.engine.trace.cursor > 0:
+            self.seek(self.engine.trace.cursor - 1)
+    
+    def seek(self, step):
+        """Show the recorded configuration after `step` moves; stepping on branches from there"""
+        self.scheduler.stop()
+        self.pending_moves = None
+        self.run_button.configure(text="Run")
+        self.engine.seek(step)
+        self.processing = self.engine.result is None
+        self.nondeterministic_choice_made = False
+        self.renderer.refresh()
+        self.show_configuration()
+        if self.engine.result is not None:
+            self.result_label.configure(text=f"Result: {self.engine.result.describe()}")
+        else:
+            self.result_label.configure(text="Result: Processing...")
+    
+    def start_profiling(self):
+        self.profiler.start_session()
+        if not self.overlay.shown:
+            self.overlay.toggle()
+    
+    def export_pstats(self):
+        if self.profiler.profile is None:
+            messagebox.showwarning("No Session", "Start a profiling session first (Tools menu).")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".prof",
+                                            filetypes=[("cProfile statistics", "*.prof")])
+        if path:
+            self.profiler.export_pstats(path)
+    
+    def export_chrome_trace(self):
+        if self.profiler.profile is None:
+            messagebox.showwarning("No Session", "Start a profiling session first (Tools menu).")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if path:
+            self.profiler.export_chrome_trace(path)
+    
+    def save_trace(self):
+        if self.engine.trace is None:
+            messagebox.showwarning("No Trace", "Start processing a string to record a trace.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".trace",
+                                            filetypes=[("NPDA traces", "*.trace")])
+        if path:
+            self.engine.trace.save(path)
+    
+    def load_trace(self):
+        path = filedialog.askopenfilename(filetypes=[("NPDA traces", "*.trace"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            trace = Trace.load(path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Load Trace", str(error))
+            return
+        if self.machine is not None:
+            self.use_machine(None)  # traces record runs of the palindrome NPDA
+        self.reset()
+        self.engine.load(trace.input_string)
+        self.engine.trace = trace
+        self.input_entry.delete(0, tk.END)
+        self.input_entry.insert(0, trace.input_string)
+        self.current_input_label.configure(text=f"Current Input: {self.short_input()}")
+        self.start_button.configure(state=tk.DISABLED)
+        self.seek(trace.steps)
+    
+    def show_status(self, status):
+        """Show the configuration after a step and report the result once halted"""
+        if status != npda.CONTINUE:
+            self.processing = False
+        self.show_configuration()
+        
+        if self.machine is not None:
+            if status != npda.CONTINUE:
+                result = self.engine.result
+                self.result_label.configure(text=f"Result: {result.describe()}")
+                self.show_result(result.accepted, f"'{self.short_input()}': {result.describe()}")
+            return
+        if status == npda.ACCEPTED:
+            self.result_label.configure(text="Result: Accepted (Palindrome)")
+            self.show_result(True, f"'{self.short_input()}' is a valid palindrome!")
+        elif status == npda.REJECTED:
+            result = self.engine.result
+            self.result_label.configure(text=f"Result: {result.describe()}")
+            self.show_result(False, f"'{self.short_input()}' is NOT a valid palindrome!",
+                             self.result_detail_text(result))
+
+
+def run(result_cache_file=None):
+    root = tk.Tk()
+    app = PDAVisualizerApp(root, result_cache_file)
+    root.mainloop()
@@ -0,0 +1,470 @@
+"""Arbitrary pushdown automata loaded from JSON or YAML definitions.
+
+A definition lists the states, the input and stack alphabets, the initial
+stack symbol, the transitions and the acceptance mode:
+
+    {
+      "name": "a^n b^n",
+      "states": ["q0", "q1", "q2"],
+      "start": "q0",
+      "accepting": ["q2"],
+      "accept_by": "final_state",
+      "input_alphabet": ["a", "b"],
+      "stack_alphabet": ["A", "Z"],
+      "bottom": "Z",
+      "transitions": [
+        ["q0", "a", "ε", "q0", "A", "Read 'a', push 'A'"],
+        ...
+      ]
+    }
+
+Transitions use the notation of npda.TRANSITIONS: (state, input symbol,
+stack top, next state, replacement, description), where ε (or "") as the
+input does not read a symbol, ε as the stack top does not inspect or pop
+it, and the replacement is written top first. accept_by is "final_state" or
+"empty_stack". Definitions are compiled into a flat transition table and
+simulated breadth-first over sets of configurations. Stacks are interned in
+a StackTable shared by all branches, so a configuration is a (state, stack
+id) pair, a move costs O(1) whatever the stack depth, and memory grows with
+the number of configurations rather than with their stack depths:
+
+    python3 machine.py machines/anbn.json aabb aab
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+
+import npda
+
+FINAL_STATE = "final_state"
+EMPTY_STACK = "empty_stack"
+
+# Rejection reasons
+NO_TRANSITION = "no_transition"
+NOT_ACCEPTING = "not_accepting"
+LIMIT = "limit"
+
+MAX_CONFIGURATIONS = 100000  # distinct configurations per input position
+STACK_SLACK = 16  # stack symbols allowed beyond twice the input length
+
+
+class DefinitionError(ValueError):
+    pass
+
+
+def _symbol(value):
+    return "" if value in (None, npda.EPSILON) else str(value)
+
+
+class StackTable:
+    """Interned stacks of one run.
+
+    A stack is an integer id; the table holds the top symbol code, the id of
+    the stack below and the depth of every id, and id 0 is the empty stack.
+    Pushing a symbol onto a stack always returns the same id, so equal stacks
+    have equal ids and configurations are deduplicated by comparing ids.
+    """
+    EMPTY = 0
+
+    def __init__(self, empty_code):
+        self.tops = [empty_code]
+        self.below = [self.EMPTY]
+        self.depths = [0]
+        self.ids = {}  # (stack id, pushed code) -> stack id
+
+    def push(self, stack, codes):
+        """Id of `stack` with `codes` pushed, bottom first"""
+        ids = self.ids
+        for code in codes:
+            key = (stack, code)
+            pushed = ids.get(key)
+            if pushed is None:
+                pushed = ids[key] = len(self.tops)
+                self.tops.append(code)
+                self.below.append(stack)
+                self.depths.append(self.depths[stack] + 1)
+            stack = pushed
+        return stack
+
+    def codes(self, stack):
+        """Symbol codes of a stack, bottom first"""
+        codes = []
+        while stack != self.EMPTY:
+            codes.append(self.tops[stack])
+            stack = self.below[stack]
+        codes.reverse()
+        return codes
+
+    def __len__(self):
+        return len(self.tops)
+
+
+class Machine:
+    """A compiled PDA definition"""
+
+    def __init__(self, definition):
+        try:
+            self.name = definition.get("name", "PDA")
+            self.states = tuple(definition["states"])
+            self.start = definition.get("start", self.states[0])
+            self.accepting = tuple(definition.get("accepting", ()))
+            self.accept_by = definition.get("accept_by", FINAL_STATE)
+            self.alphabet = tuple(definition["input_alphabet"])
+            self.stack_alphabet = tuple(definition["stack_alphabet"])
+            self.bottom = definition.get("bottom")
+            raw_transitions = definition["transitions"]
+        except (KeyError, IndexError, AttributeError, TypeError) as error:
+            raise DefinitionError(f"incomplete machine definition: {error}") from None
+        self.digest = hashlib.blake2b(json.dumps(definition, sort_keys=True).encode("utf-8"),
+                                      digest_size=16).hexdigest()
+
+        if self.accept_by not in (FINAL_STATE, EMPTY_STACK):
+            raise DefinitionError(f"accept_by must be {FINAL_STATE!r} or {EMPTY_STACK!r}")
+        for state in (self.start,) + self.accepting:
+            if state not in self.states:
+                raise DefinitionError(f"unknown state {state!r}")
+        if any(len(symbol) != 1 for symbol in self.alphabet):
+            raise DefinitionError("input symbols must be single characters")
+        if len(self.stack_alphabet) > 255:
+            raise DefinitionError("at most 255 stack symbols are supported")
+        if self.bottom is not None and self.bottom not in self.stack_alphabet:
+            raise DefinitionError(f"bottom symbol {self.bottom!r} is not in the stack alphabet")
+
+        self.transitions = tuple(self._transition(transition) for transition in raw_transitions)
+        self.compile()
+
+    def _transition(self, transition):
+        if isinstance(transition, dict):
+            transition = (transition.get("from"), transition.get("input"), transition.get("top"),
+                          transition.get("to"), transition.get("push"), transition.get("description", ""))
+        if len(transition) == 5:
+            transition = tuple(transition) + ("",)
+        state, symbol, top, next_state, replacement, description = transition
+        symbol, top = _symbol(symbol), _symbol(top)
+        if isinstance(replacement, (list, tuple)):
+            replacement = tuple(replacement)
+        else:
+            replacement = self._tokenize(_symbol(replacement))
+        for name in (state, next_state):
+            if name not in self.states:
+                raise DefinitionError(f"transition {transition!r} uses unknown state {name!r}")
+        if symbol and symbol not in self.alphabet:
+            raise DefinitionError(f"transition {transition!r} reads unknown symbol {symbol!r}")
+        for name in (top,) * bool(top) + replacement:
+            if name not in self.stack_alphabet:
+                raise DefinitionError(f"transition {transition!r} uses unknown stack symbol {name!r}")
+        return (state, symbol or npda.EPSILON, top or npda.EPSILON, next_state,
+                "".join(replacement) or npda.EPSILON, description, replacement)
+
+    def _tokenize(self, text):
+        """Split a replacement string into stack symbols, longest match first"""
+        symbols = []
+        by_length = sorted(self.stack_alphabet, key=len, reverse=True)
+        while text:
+            symbol = next((s for s in by_length if text.startswith(s)), None)
+            if symbol is None:
+                raise DefinitionError(f"{text!r} does not start with a stack symbol")
+            symbols.append(symbol)
+            text = text[len(symbol):]
+        return tuple(symbols)
+
+    def compile(self):
+        """Index the transitions by (state, input, stack top).
+
+        delta[(state * (inputs + 1) + input) * (tops + 1) + top] holds the
+        moves as (next state, pop the top?, pushed codes bottom first); input
+        code `inputs` is ε and top code `tops` is the empty stack. Moves that
+        do not inspect the top are listed under every top.
+        """
+        self.state_code = {state: code for code, state in enumerate(self.states)}
+        self.input_code = {symbol: code for code, symbol in enumerate(self.alphabet)}
+        self.top_code = {symbol: code for code, symbol in enumerate(self.stack_alphabet)}
+        inputs, tops = len(self.alphabet), len(self.stack_alphabet)
+        self.num_inputs, self.num_tops = inputs + 1, tops + 1
+        self.epsilon_code, self.empty_code = inputs, tops
+
+        delta = [[] for _ in range(len(self.states) * self.num_inputs * self.num_tops)]
+        for state, symbol, top, next_state, _, _, replacement in self.transitions:
+            symbol_code = self.epsilon_code if symbol == npda.EPSILON else self.input_code[symbol]
+            push = bytes(self.top_code[name] for name in reversed(replacement))
+            base = (self.state_code[state] * self.num_inputs + symbol_code) * self.num_tops
+            if top == npda.EPSILON:
+                for top_code in range(self.num_tops):
+                    delta[base + top_code].append((self.state_code[next_state], False, push))
+            else:
+                delta[base + self.top_code[top]].append((self.state_code[next_state], True, push))
+        self.delta = [tuple(moves) for moves in delta]
+        self.accepting_codes = frozenset(self.state_code[state] for state in self.accepting)
+        initial = bytes([self.top_code[self.bottom]]) if self.bottom is not None else b""
+        self.initial = (self.state_code[self.start], initial)
+
+    # Breadth-first simulation over sets of (state code, StackTable id)
+    def validate(self, string):
+        """Return a warning message if the string can not be processed, else None"""
+        unknown = set(string) - set(self.alphabet)
+        if unknown:
+            return f"Input must only contain {', '.join(map(repr, self.alphabet))}."
+        return None
+
+    def initial_configuration(self, stacks):
+        """Initial configuration, with its stack interned in `stacks`"""
+        state, codes = self.initial
+        return state, stacks.push(StackTable.EMPTY, codes)
+
+    def closure(self, configurations, stacks, max_stack, limit=MAX_CONFIGURATIONS):
+        """Configurations reachable with ε-moves; returns (set, whether any were cut off)"""
+        delta, num_inputs, num_tops, epsilon = self.delta, self.num_inputs, self.num_tops, self.epsilon_code
+        tops, below, depths = stacks.tops, stacks.below, stacks.depths
+        seen = set(configurations)
+        pending = list(seen)
+        truncated = False
+        while pending:
+            state, stack = pending.pop()
+            for next_state, pop, push in delta[(state * num_inputs + epsilon) * num_tops + tops[stack]]:
+                new_stack = below[stack] if pop else stack
+                if push:
+                    new_stack = stacks.push(new_stack, push)
+                if depths[new_stack] > max_stack:
+                    truncated = True
+                    continue
+                config = (next_state, new_stack)
+                if config not in seen:
+                    seen.add(config)
+                    pending.append(config)
+                    if len(seen) > limit:
+                        raise OverflowError(f"more than {limit} configurations")
+        return seen, truncated
+
+    def consume(self, configurations, symbol_code, stacks):
+        """Configurations after reading one input symbol (before ε-moves)"""
+        delta, num_inputs, num_tops = self.delta, self.num_inputs, self.num_tops
+        tops, below = stacks.tops, stacks.below
+        result = set()
+        for state, stack in configurations:
+            for next_state, pop, push in delta[(state * num_inputs + symbol_code) * num_tops + tops[stack]]:
+                new_stack = below[stack] if pop else stack
+                result.add((next_state, stacks.push(new_stack, push) if push else new_stack))
+        return result
+
+    def accepts(self, configurations):
+        if self.accept_by == EMPTY_STACK:
+            return any(stack == StackTable.EMPTY for _, stack in configurations)
+        accepting = self.accepting_codes
+        return any(state in accepting for state, _ in configurations)
+
+    def max_stack(self, string):
+        return 2 * len(string) + STACK_SLACK
+
+    def run(self, string, max_stack=None, limit=MAX_CONFIGURATIONS):
+        """Decide a string by following every branch at once"""
+        warning = self.validate(string)
+        if warning:
+            raise ValueError(warning)
+        max_stack = self.max_stack(string) if max_stack is None else max_stack
+        input_code = self.input_code
+        stacks = StackTable(self.empty_code)
+        position = 0
+        try:
+            configurations, truncated = self.closure({self.initial_configuration(stacks)}, stacks,
+                                                     max_stack, limit)
+            for position, symbol in enumerate(string):
+                configurations = self.consume(configurations, input_code[symbol], stacks)
+                if not configurations:
+                    return MachineResult(False, NO_TRANSITION, position, symbol, truncated=truncated)
+                configurations, cut = self.closure(configurations, stacks, max_stack, limit)
+                truncated = truncated or cut
+        except OverflowError:
+            return MachineResult(False, LIMIT, position, truncated=True)
+        if self.accepts(configurations):
+            return MachineResult(True, position=len(string), configurations=len(configurations))
+        return MachineResult(False, NOT_ACCEPTING, len(string),
+                             configurations=len(configurations), truncated=truncated)
+
+    # Diagram
+    def edge_labels(self):
+        return npda.edge_labels([transition[:6] for transition in self.transitions])
+
+    def describe_transitions(self):
+        return npda.describe_transitions([transition[:6] for transition in self.transitions])
+
+    def layout(self):
+        """Normalized (x, y) position of every state, computed once per definition.
+
+        States are ordered breadth-first from the start state and placed in a
+        row when there are few of them, otherwise on an ellipse.
+        """
+        cached = _LAYOUTS.get(self.digest)
+        if cached is not None:
+            return cached
+        order = [self.start]
+        for state in order:
+            for transition in self.transitions:
+                if transition[0] == state and transition[3] not in order:
+                    order.append(transition[3])
+        order += [state for state in self.states if state not in order]
+
+        if len(order) <= 4:
+            positions = {state: ((i + 0.5) / len(order), 0.5) for i, state in enumerate(order)}
+        else:
+            positions = {}
+            for i, state in enumerate(order):
+                angle = math.pi + 2 * math.pi * i / len(order)
+                positions[state] = (0.5 + 0.42 * math.cos(angle), 0.5 + 0.38 * math.sin(angle))
+        _LAYOUTS[self.digest] = positions
+        return positions
+
+    def __repr__(self):
+        return f"Machine({self.name!r}, {len(self.states)} states, {len(self.transitions)} transitions)"
+
+
+_LAYOUTS = {}
+
+
+class MachineResult:
+    """Outcome of a breadth-first run of a Machine"""
+    __slots__ = ("accepted", "reason", "position", "got", "configurations", "truncated")
+
+    def __init__(self, accepted, reason=None, position=None, got=None, configurations=0, truncated=False):
+        self.accepted = accepted
+        self.reason = reason
+        self.position = position
+        self.got = got
+        self.configurations = configurations
+        self.truncated = truncated
+
+    def describe(self):
+        if self.accepted:
+            return "Accepted"
+        if self.reason == NO_TRANSITION:
+            text = f"Rejected (No transition reads '{self.got}' at position {self.position})"
+        elif self.reason == LIMIT:
+            text = f"Rejected (Configuration limit exceeded at position {self.position})"
+        else:
+            text = "Rejected (No branch accepts after input processed)"
+        if self.truncated and self.reason != LIMIT:
+            text += " [branches with very deep stacks were not explored]"
+        return text
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"MachineResult({self.describe()})"
+
+
+class MachineStack(list):
+    """Stack symbols of a configuration, bottom first, drawable like a PushdownStack"""
+
+    def summary(self, k=8):
+        if len(self) <= k:
+            return str(list(self))
+        return f"[…, {', '.join(map(repr, self[-k:]))}] (depth {len(self)})"
+
+
+class MachineRun:
+    """Step-by-step breadth-first run, driven like a PalindromeNPDA.
+
+    Each step reads one input symbol on every branch at once. The state and
+    stack shown are those of one representative configuration of the set.
+    """
+
+    def __init__(self, machine, input_string=""):
+        self.machine = machine
+        self.load(input_string)
+
+    def load(self, input_string):
+        self.input_string = input_string
+        self.position = 0
+        self.result = None
+        self.trace = None
+        self.max_stack = self.machine.max_stack(input_string)
+        self.stacks = StackTable(self.machine.empty_code)
+        start = self.machine.initial_configuration(self.stacks)
+        self.configurations, self.truncated = self.machine.closure({start}, self.stacks, self.max_stack)
+        self.current = min(self.configurations)
+
+    @property
+    def state(self):
+        return self.machine.states[self.current[0]]
+
+    @property
+    def stack(self):
+        names = self.machine.stack_alphabet
+        return MachineStack(names[code] for code in self.stacks.codes(self.current[1]))
+
+    @property
+    def halted(self):
+        return self.result is not None
+
+    def choose_center(self):
+        pass  # every branch is followed at once
+
+    def step(self):
+        if self.result is not None:
+            return npda.ACCEPTED if self.result.accepted else npda.REJECTED
+        machine = self.machine
+        if self.position == len(self.input_string):
+            if machine.accepts(self.configurations):
+                if machine.accept_by == EMPTY_STACK:
+                    self.current = min(c for c in self.configurations if c[1] == StackTable.EMPTY)
+                else:
+                    self.current = min(c for c in self.configurations if c[0] in machine.accepting_codes)
+                self.result = MachineResult(True, position=self.position,
+                                            configurations=len(self.configurations))
+                return npda.ACCEPTED
+            self.result = MachineResult(False, NOT_ACCEPTING, self.position,
+                                        configurations=len(self.configurations), truncated=self.truncated)
+            return npda.REJECTED
+
+        symbol = self.input_string[self.position]
+        configurations = machine.consume(self.configurations, machine.input_code[symbol], self.stacks)
+        if not configurations:
+            self.result = MachineResult(False, NO_TRANSITION, self.position, symbol, truncated=self.truncated)
+            return npda.REJECTED
+        try:
+            self.configurations, cut = machine.closure(configurations, self.stacks, self.max_stack)
+        except OverflowError:
+            self.result = MachineResult(False, LIMIT, self.position, truncated=True)
+            return npda.REJECTED
+        self.truncated = self.truncated or cut
+        self.current = min(self.configurations)
+        self.position += 1
+        return npda.CONTINUE
+
+
+def load_machine(path):
+    """Load a machine definition from a .json, .yaml or .yml file"""
+    with open(path, encoding="utf-8") as source:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise DefinitionError("YAML definitions need PyYAML: pip3 install pyyaml") from None
+            definition = yaml.safe_load(source)
+        else:
+            definition = json.load(source)
+    return Machine(definition)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decide strings with a PDA loaded from JSON or YAML")
+    parser.add_argument("machine", help="machine definition file")
+    parser.add_argument("strings", nargs="*")
+    parser.add_argument("--describe", action="store_true", help="print the transitions")
+    args = parser.parse_args(argv)
+
+    machine = load_machine(args.machine)
+    if args.describe:
+        print(f"{machine.name}: states {', '.join(machine.states)}, accepting by {machine.accept_by}")
+        print("\n".join(machine.describe_transitions()))
+    for string in args.strings:
+        warning = machine.validate(string)
+        print(f"{string}: {warning or machine.run(string).describe()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
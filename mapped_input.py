@@ -0,0 +1,174 @@
+"""Memory-mapped input files as the tape of the palindrome NPDA.
+
+A MappedTape maps a file of a's and b's instead of reading it into a str,
+so inputs larger than RAM can be decided at disk bandwidth. decide() walks
+outwards from the center a chunk at a time: each chunk after the center is
+compared with the mirrored chunk before it, reversed in C, and both are
+validated on the way by deleting the alphabet with bytes.translate() and
+checking that nothing is left. Each chunk is copied out of the map (slicing
+an mmap copies, and translate() needs bytes), and the left one once more
+when it is reversed, so memory use is a few chunks whatever the size of the
+file; the copies cost less than validating memoryview slices with a regex.
+Trailing whitespace (a final newline) is not part of the tape.
+
+    python3 mapped_input.py huge.txt
+"""
+import argparse
+import mmap
+import os
+import sys
+import time
+
+import npda
+
+CHUNK_SIZE = 1 << 20
+ALPHABET = npda.ALPHABET.encode("ascii")
+TRAILING = b" \t\r\n"
+
+
+class MappedTape:
+    """Read-only tape over a memory-mapped file; indexes like a str of a's and b's"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        # Empty files can not be mapped
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        length = size
+        while length and self.map[length - 1] in TRAILING:
+            length -= 1
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            return self.map[start:stop:step].decode("latin-1")
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("tape index out of range")
+        return chr(self.map[index])
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return f"MappedTape({self.path!r}, {self.length} symbols)"
+
+    def invalid_position(self, start, chunk):
+        """Position of the first symbol of chunk (read at start) outside the alphabet, or None"""
+        if not chunk.translate(None, ALPHABET):
+            return None
+        return start + len(chunk) - len(chunk.lstrip(ALPHABET))
+
+    def invalid_warning(self, position):
+        return (f"Input must only contain 'a' and 'b' "
+                f"(found {chr(self.map[position])!r} at position {position}).")
+
+    def validate(self, chunk_size=CHUNK_SIZE):
+        """Return a warning message if the tape can not be processed, else None"""
+        if not self.length:
+            return "The file contains no input."
+        for start in range(0, self.length, chunk_size):
+            position = self.invalid_position(start, self.map[start:min(start + chunk_size, self.length)])
+            if position is not None:
+                return self.invalid_warning(position)
+        return None
+
+    def decide(self, progress=None, chunk_size=CHUNK_SIZE):
+        """Decide the tape like npda.run, validating it in the same pass.
+
+        Raises ValueError with the warning of validate() for invalid tapes.
+        `progress` is called as progress(symbols read, length) after every
+        pair of chunks.
+        """
+        n = self.length
+        if not n:
+            raise ValueError(self.validate())
+        data = self.map
+        center = n // 2
+        result = None
+        # Offsets k from the center: position center + k is matched against center - 1 - k
+        for k in range(0, center, chunk_size):
+            end = min(k + chunk_size, center)
+            right = data[center + k:center + end]
+            left = data[center - end:center - k]
+            for start, chunk in ((center - end, left), (center + k, right)):
+                position = self.invalid_position(start, chunk)
+                if position is not None:
+                    raise ValueError(self.invalid_warning(position))
+            if result is None:
+                mirrored = left[::-1]
+                if right != mirrored:
+                    j = first_difference(right, mirrored)
+                    result = npda.Result(False, npda.MISMATCH, center + k + j, chr(mirrored[j]),
+                                         chr(right[j]), center)
+            if progress is not None:
+                progress(2 * end, n)
+        if n % 2:
+            # Odd length: the last symbol is read with only Z₀ left on the stack
+            position = self.invalid_position(n - 1, data[n - 1:n])
+            if position is not None:
+                raise ValueError(self.invalid_warning(position))
+            if result is None:
+                result = npda.Result(False, npda.STACK_EMPTY_EARLY, n - 1, center=center)
+        return result or npda.Result(True, center=center)
+
+
+def first_difference(left, right):
+    """Index of the first byte at which two equal-length, different byte strings differ"""
+    # Bisect with slice comparisons in C instead of looping over the bytes in Python
+    low, high = 0, len(left)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if left[low:middle] != right[low:middle]:
+            high = middle
+        else:
+            low = middle
+    return low
+
+
+def decide_file(path, progress=None):
+    """Map, decide and close a file; usable as a worker.BackgroundJob task"""
+    with MappedTape(path) as tape:
+        return tape.decide(progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decide a file of a's and b's without reading it into memory")
+    parser.add_argument("file")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="bytes compared at a time")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+
+    start = time.perf_counter()
+    try:
+        with MappedTape(args.file) as tape:
+            result = tape.decide(chunk_size=args.chunk_size)
+            length = len(tape)
+    except (OSError, ValueError) as error:
+        print(f"{args.file}: {error}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+    print(result.describe())
+    print(f"{length} symbols in {elapsed:.2f}s ({length / max(elapsed, 1e-9) / 1e6:.0f} MB/s)",
+          file=sys.stderr)
+    return 0 if result.accepted else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
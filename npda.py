@@ -0,0 +1,522 @@
+"""Headless NPDA engine for L = {ww^r | w belongs {a, b}^+}.
+
+This module has no Tk dependency so strings can be decided (and the automaton
+benchmarked) on machines without a display. The visualizer drives the same
+engine one step at a time and only renders its configuration.
+"""
+
+# States
+Q0 = "q0"  # pushing
+Q1 = "q1"  # matching
+Q2 = "q2"  # accepting
+
+# Step results
+CONTINUE = "continue"
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+
+# Rejection reasons
+MISMATCH = "mismatch"
+STACK_NOT_EMPTY = "stack_not_empty"
+STACK_EMPTY_EARLY = "stack_empty_early"
+EMPTY_INPUT = "empty_input"  # ww^r needs a non-empty w
+
+ALPHABET = "ab"
+EPSILON = "ε"
+BOTTOM = "Z₀"
+
+ACCEPTING_STATES = (Q2,)
+
+PROGRESS_EVERY = 1 << 16  # iterations between progress callbacks of long runs
+
+# Transition table: (state, input symbol, stack top, next state, replacement, description).
+# The replacement is written top first and replaces the stack top; a stack top
+# of ε means the top is not inspected, so the replacement is pushed on top of it.
+TRANSITIONS = (
+    (Q0, "a", EPSILON, Q0, "a", "Read 'a', push 'a' to stack"),
+    (Q0, "b", EPSILON, Q0, "b", "Read 'b', push 'b' to stack"),
+    (Q0, EPSILON, EPSILON, Q1, EPSILON, "Non-deterministically guess the middle"),
+    (Q1, "a", "a", Q1, EPSILON, "Read 'a', match 'a' on stack top, pop it"),
+    (Q1, "b", "b", Q1, EPSILON, "Read 'b', match 'b' on stack top, pop it"),
+    (Q1, EPSILON, BOTTOM, Q2, EPSILON, "If end of input and stack has only Z₀ → Accept"),
+)
+
+
+def transition_label(transition):
+    """Diagram notation of a transition, e.g. (a, a | ε)"""
+    _, symbol, top, _, replacement, _ = transition
+    return f"({symbol}, {top} | {replacement})"
+
+
+def edge_labels(transitions=TRANSITIONS):
+    """Labels of every edge of the state diagram keyed by (state, next state)"""
+    labels = {}
+    for transition in transitions:
+        edge = (transition[0], transition[3])
+        labels.setdefault(edge, []).append(transition_label(transition))
+    return {edge: "\n".join(edge_text) for edge, edge_text in labels.items()}
+
+
+def describe_transitions(transitions=TRANSITIONS):
+    """One line per transition for the visualizer's description panel"""
+    lines = []
+    for transition in transitions:
+        state, next_state, description = transition[0], transition[3], transition[5]
+        where = f"In {state}" if state == next_state else f"From {state} to {next_state}"
+        detail = f" - {description}" if description else ""
+        lines.append(f"• {where}: {transition_label(transition)}{detail}")
+    return lines
+
+
+# The table compiled into a flat list indexed by integer codes, so each step is
+# a single list lookup: _DELTA[(state * _NUM_INPUTS + symbol) * _NUM_TOPS + top]
+# holds (next state code, pop the top?, symbols to push) or None.
+STATES = (Q0, Q1, Q2)
+_STATE_CODE = {state: code for code, state in enumerate(STATES)}
+_EPSILON_CODE = len(ALPHABET)
+_OTHER_CODE = len(ALPHABET) + 1  # any symbol outside the alphabet
+_NUM_INPUTS = len(ALPHABET) + 2
+_BOTTOM_CODE = len(ALPHABET)
+_NUM_TOPS = len(ALPHABET) + 1
+
+_INPUT_CODE = [_OTHER_CODE] * 256
+_TOP_CODE = [_BOTTOM_CODE] * 256
+for _code, _symbol in enumerate(ALPHABET):
+    _INPUT_CODE[ord(_symbol)] = _code
+    _TOP_CODE[ord(_symbol)] = _code
+_INPUT_TRANSLATION = bytes(_INPUT_CODE)
+
+
+def compile_transitions(transitions=TRANSITIONS):
+    delta = [None] * (len(STATES) * _NUM_INPUTS * _NUM_TOPS)
+    tops = tuple(ALPHABET) + (BOTTOM,)
+    for state, symbol, top, next_state, replacement, _ in transitions:
+        symbol_code = _EPSILON_CODE if symbol == EPSILON else ALPHABET.index(symbol)
+        replacement = "" if replacement == EPSILON else replacement
+        for top_code, current_top in enumerate(tops):
+            if top not in (EPSILON, current_top):
+                continue
+            if top == EPSILON and current_top != BOTTOM:
+                replacement_here = replacement + current_top  # the top stays in place
+            else:
+                replacement_here = replacement
+            # Keep the unchanged bottom part of the replacement instead of popping it
+            pop = current_top != BOTTOM
+            if pop and replacement_here.endswith(current_top):
+                pop = False
+                replacement_here = replacement_here[:-1]
+            push = replacement_here[::-1].encode("latin-1")
+            index = (_STATE_CODE[state] * _NUM_INPUTS + symbol_code) * _NUM_TOPS + top_code
+            delta[index] = (_STATE_CODE[next_state], pop, push)
+    return delta
+
+
+_DELTA = compile_transitions()
+_ACCEPTING_CODES = frozenset(_STATE_CODE[state] for state in ACCEPTING_STATES)
+
+
+def _input_codes(string):
+    """Input symbols as table codes, one byte per symbol"""
+    try:
+        return string.encode("latin-1").translate(_INPUT_TRANSLATION)
+    except UnicodeEncodeError:
+        return bytes(_INPUT_CODE[ord(c)] if ord(c) < 256 else _OTHER_CODE for c in string)
+
+
+def progress_range(stop, progress=None, start=0):
+    """range(start, stop) that calls progress(done, total) every PROGRESS_EVERY items.
+
+    Without a callback this is a plain range, so hot loops only pay for
+    progress reporting when somebody listens.
+    """
+    if progress is None:
+        return range(start, stop)
+    return _reporting_range(start, stop, progress)
+
+
+def _reporting_range(start, stop, progress):
+    for chunk in range(start, stop, PROGRESS_EVERY):
+        progress(chunk, stop)
+        yield from range(chunk, min(chunk + PROGRESS_EVERY, stop))
+
+
+def validate(string):
+    """Return a warning message if the string can not be processed, else None"""
+    if not string:
+        return "Please enter a string."
+    if string.strip(ALPHABET):
+        return "Input must only contain 'a' and 'b'."
+    return None
+
+
+class PushdownStack:
+    """Compact stack of single-character symbols backed by a bytearray.
+
+    Each symbol takes one byte instead of a pointer to a string object, and
+    push, pop and peek are O(1). Indexing returns symbols as strings with
+    index 0 at the bottom, so it can be drawn like a list.
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, symbols=""):
+        self.data = bytearray(symbols, "latin-1")
+
+    def push(self, symbol):
+        self.data.append(ord(symbol))
+
+    def pop(self):
+        return chr(self.data.pop())
+
+    def peek(self):
+        """Top symbol, or None for an empty stack"""
+        return chr(self.data[-1]) if self.data else None
+
+    def copy(self):
+        stack = PushdownStack()
+        stack.data = bytearray(self.data)
+        return stack
+
+    def summary(self, k=8):
+        """List-like text of at most the top k symbols, with the depth if truncated"""
+        if len(self.data) <= k:
+            return str(list(self.data.decode("latin-1")))
+        top = ", ".join(repr(chr(symbol)) for symbol in self.data[-k:])
+        return f"[…, {top}] (depth {len(self.data)})"
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        return chr(self.data[index])
+
+    def __iter__(self):
+        return iter(self.data.decode("latin-1"))
+
+    def __eq__(self, other):
+        if isinstance(other, PushdownStack):
+            return self.data == other.data
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"PushdownStack({self.summary()})"
+
+
+class Configuration:
+    """Instantaneous description of the NPDA: (state, input position, stack)"""
+    __slots__ = ("state", "position", "stack")
+
+    def __init__(self, state=Q0, position=0, stack=None):
+        self.state = state
+        self.position = position
+        self.stack = PushdownStack() if stack is None else stack
+
+    def copy(self):
+        return Configuration(self.state, self.position, self.stack.copy())
+
+    def __eq__(self, other):
+        return (isinstance(other, Configuration)
+                and (self.state, self.position, self.stack)
+                == (other.state, other.position, other.stack))
+
+    def __repr__(self):
+        return f"Configuration({self.state!r}, {self.position}, {self.stack!r})"
+
+
+class Result:
+    """Outcome of a run, including the reason and location of a rejection"""
+    __slots__ = ("accepted", "reason", "position", "expected", "got", "center")
+
+    def __init__(self, accepted, reason=None, position=None, expected=None, got=None, center=None):
+        self.accepted = accepted
+        self.reason = reason
+        self.position = position
+        self.expected = expected
+        self.got = got
+        self.center = center
+
+    def describe(self):
+        """Short human readable explanation, worded like the visualizer's results"""
+        if self.accepted:
+            return "Accepted (Palindrome)"
+        if self.reason == MISMATCH:
+            return (f"Rejected (Mismatch at position {self.position}, "
+                    f"expected '{self.expected}' but got '{self.got}')")
+        if self.reason == STACK_EMPTY_EARLY:
+            return "Rejected (Stack empty before end of input)"
+        if self.reason == EMPTY_INPUT:
+            return "Rejected (Empty input)"
+        return "Rejected (Stack not empty after input processed)"
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"Result({self.describe()})"
+
+
+class PalindromeNPDA:
+    """Step-by-step simulation of the palindrome NPDA.
+
+    The only nondeterministic move is the q0 -> q1 epsilon transition, which is
+    taken by calling choose_center(); step() performs the next deterministic
+    move from the current configuration.
+    """
+
+    def __init__(self, input_string=""):
+        self.load(input_string)
+
+    def load(self, input_string):
+        self.input_string = input_string
+        self.config = Configuration()
+        self.result = None
+        self.trace = None  # optional tracefile.Trace recording every move
+
+    # Convenience accessors for the current configuration
+    @property
+    def state(self):
+        return self.config.state
+
+    @property
+    def position(self):
+        return self.config.position
+
+    @property
+    def stack(self):
+        return self.config.stack
+
+    @property
+    def halted(self):
+        return self.result is not None
+
+    def choose_center(self):
+        """Take the (ε, ε | ε) transition from q0 to q1"""
+        if self.config.state == Q0:
+            if self.trace is None:
+                self._apply(self._lookup(_EPSILON_CODE))
+                return
+            depth, top = self._stack_top()
+            self._apply(self._lookup(_EPSILON_CODE))
+            self.trace.record(self, depth, top)
+
+    def seek(self, step):
+        """Restore the configuration after `step` moves of the recorded trace"""
+        self.config = self.trace.configuration_at(step)
+        self.result = self.trace.result if self.trace.halted_at(step) else None
+        self.trace.cursor = step
+
+    def _stack_top(self):
+        stack = self.config.stack.data
+        return len(stack), stack[-1] if stack else None
+
+    def _lookup(self, symbol_code):
+        stack = self.config.stack.data
+        top_code = _TOP_CODE[stack[-1]] if stack else _BOTTOM_CODE
+        return _DELTA[(_STATE_CODE[self.config.state] * _NUM_INPUTS + symbol_code) * _NUM_TOPS + top_code]
+
+    def _apply(self, action):
+        next_state, pop, push = action
+        stack = self.config.stack.data
+        if pop:
+            stack.pop()
+        stack += push
+        self.config.state = STATES[next_state]
+
+    def step(self):
+        """Perform one move and return CONTINUE, ACCEPTED or REJECTED"""
+        if self.result is not None:
+            return ACCEPTED if self.result.accepted else REJECTED
+        if self.trace is None:
+            return self._step()
+        depth, top = self._stack_top()
+        status = self._step()
+        self.trace.record(self, depth, top)
+        return status
+
+    def _step(self):
+        config = self.config
+        string = self.input_string
+
+        if config.position < len(string):
+            current_char = string[config.position]
+            action = self._lookup(_INPUT_CODE[ord(current_char)] if ord(current_char) < 256
+                                  else _OTHER_CODE)
+            if action is None:
+                if not config.stack:
+                    return self._halt(Result(False, STACK_EMPTY_EARLY, config.position))
+                # The top can not be removed from the stack as there is a mismatch
+                return self._halt(Result(False, MISMATCH, config.position,
+                                         config.stack.peek(), current_char))
+            self._apply(action)
+            config.position += 1
+            # At the end of input the only possible move in q0 is to start matching;
+            # it is part of this step, so a trace records the two as one move
+            if config.position == len(string) and config.state == Q0:
+                self._apply(self._lookup(_EPSILON_CODE))
+            return CONTINUE
+
+        # End of input: only epsilon moves remain
+        if not string:
+            return self._halt(Result(False, EMPTY_INPUT, 0))
+        if config.state in ACCEPTING_STATES:
+            return self._halt(Result(True))
+        action = self._lookup(_EPSILON_CODE)
+        if action is None:
+            return self._halt(Result(False, STACK_NOT_EMPTY, config.position))
+        self._apply(action)
+        if config.state in ACCEPTING_STATES:
+            return self._halt(Result(True))
+        return CONTINUE
+
+    def _halt(self, result):
+        self.result = result
+        return ACCEPTED if result.accepted else REJECTED
+
+    @staticmethod
+    def run(string, center=None, progress=None):
+        """Decide a string, guessing the center after `center` pushes.
+
+        Without an explicit center the middle of the string is used, which is
+        the only guess that can lead to acceptance for ww^r. `progress` is
+        called as progress(position, n + 1) every PROGRESS_EVERY symbols.
+        """
+        n = len(string)
+        if center is None:
+            center = n // 2
+        if not n:
+            return Result(False, EMPTY_INPUT, 0, center=center)
+        tape = _input_codes(string)
+        delta = _DELTA
+        top_codes = _TOP_CODE
+        stack = bytearray()
+        state = _STATE_CODE[Q0]
+        guess_state = state
+
+        for position in progress_range(n + 1, progress):
+            if position == center and state == guess_state:
+                # The guessed center: take the epsilon move out of q0
+                top = top_codes[stack[-1]] if stack else _BOTTOM_CODE
+                state, pop, push = delta[(state * _NUM_INPUTS + _EPSILON_CODE) * _NUM_TOPS + top]
+                if pop:
+                    stack.pop()
+                stack += push
+            if position == n:
+                break
+            top = top_codes[stack[-1]] if stack else _BOTTOM_CODE
+            action = delta[(state * _NUM_INPUTS + tape[position]) * _NUM_TOPS + top]
+            if action is None:
+                if not stack:
+                    return Result(False, STACK_EMPTY_EARLY, position, center=center)
+                return Result(False, MISMATCH, position, chr(stack[-1]), string[position], center)
+            state, pop, push = action
+            if pop:
+                stack.pop()
+            stack += push
+
+        # End of input: follow epsilon moves into an accepting state
+        for _ in STATES:
+            if state in _ACCEPTING_CODES:
+                return Result(True, center=center)
+            top = top_codes[stack[-1]] if stack else _BOTTOM_CODE
+            action = delta[(state * _NUM_INPUTS + _EPSILON_CODE) * _NUM_TOPS + top]
+            if action is None:
+                break
+            state, pop, push = action
+            if pop:
+                stack.pop()
+            stack += push
+        return Result(False, STACK_NOT_EMPTY, n, center=center)
+
+
+def run(string, center=None, progress=None):
+    """Decide `string` without any GUI; see PalindromeNPDA.run"""
+    return PalindromeNPDA.run(string, center, progress)
+
+
+# Moves reported in an accepting path
+PUSH = "push"
+GUESS_CENTER = "guess_center"
+POP = "pop"
+ACCEPT = "accept"
+
+
+class SearchResult:
+    """Outcome of exploring every branch of the nondeterministic center guess"""
+    __slots__ = ("accepted", "center", "path", "explored")
+
+    def __init__(self, accepted, center=None, path=None, explored=0):
+        self.accepted = accepted
+        self.center = center
+        self.path = path or []
+        self.explored = explored
+
+    def __repr__(self):
+        return f"SearchResult(accepted={self.accepted}, center={self.center}, explored={self.explored})"
+
+
+def search(string, progress=None):
+    """Explore every branch of the q0 -> q1 epsilon transition.
+
+    The symbols on the stack are always the first `height` input symbols, so a
+    configuration is fully described by (state, position, height) and can be
+    deduplicated with a visited set. Branches are pruned as soon as they can no
+    longer accept: in q0 the stack may not be deeper than the remaining input,
+    and in q1 every remaining symbol pops exactly one stack symbol, so the
+    height must equal the remaining input length. With this pruning only O(n)
+    configurations are visited.
+
+    Returns a SearchResult whose path lists the moves of the first accepting
+    branch, ready to be replayed on a PalindromeNPDA. `progress` is called as
+    progress(explored, 2 * n + 1) every PROGRESS_EVERY configurations.
+    """
+    n = len(string)
+    if not n:
+        return SearchResult(False)
+    start = (Q0, 0, 0)
+    parents = {start: None}
+    pending = [start]
+    explored = 0
+
+    while pending:
+        config = pending.pop()
+        explored += 1
+        if progress is not None and not explored % PROGRESS_EVERY:
+            progress(explored, 2 * n + 1)
+        state, position, height = config
+
+        if state == Q1:
+            if position == n:
+                if height == 0:
+                    path = _path_to(config, parents)
+                    return SearchResult(True, path.count(PUSH), path + [ACCEPT], explored)
+                continue
+            if string[position] != string[height - 1]:
+                continue  # mismatch, dead branch
+            successors = [((Q1, position + 1, height - 1), POP)]
+        else:
+            successors = []
+            if position < n:
+                # Reading the last symbol moves to q1 automatically
+                pushed = (Q0 if position + 1 < n else Q1, position + 1, height + 1)
+                successors.append((pushed, PUSH))
+            # Pushed last so that the guess is explored before pushing further
+            successors.append(((Q1, position, height), GUESS_CENTER))
+
+        for successor, move in successors:
+            next_state, next_position, next_height = successor
+            remaining = n - next_position
+            if next_height > remaining or (next_state == Q1 and next_height != remaining):
+                continue  # the stack can not be emptied exactly at the end of input
+            if successor not in parents:
+                parents[successor] = (config, move)
+                pending.append(successor)
+
+    return SearchResult(False, explored=explored)
+
+
+def _path_to(config, parents):
+    path = []
+    while parents[config] is not None:
+        config, move = parents[config]
+        path.append(move)
+    path.reverse()
+    return path
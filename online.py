@@ -0,0 +1,153 @@
+"""Online recognition of ww^r: a verdict after every symbol of a stream.
+
+A prefix is in L exactly when it is a non-empty even palindrome. The
+recognizer keeps a forward and a reverse polynomial hash of everything read
+so far; appending a symbol updates both in O(1), and the prefix is a
+palindrome when they are equal. Nothing is buffered, so arbitrarily long
+event streams can be followed with constant memory:
+
+    producer | python3 online.py
+    python3 online.py events.txt --all
+
+Hashing is done modulo the Mersenne prime 2^61 - 1 with a random base, so
+a false "accepted" has probability below n / 2^61 for a prefix of length n.
+"""
+import argparse
+import codecs
+import random
+import sys
+
+import npda
+
+MODULUS = (1 << 61) - 1
+CHUNK_SIZE = 1 << 16
+
+_SYMBOL_VALUE = {symbol: code for code, symbol in enumerate(npda.ALPHABET, 1)}
+
+
+class OnlineRecognizer:
+    """Feed symbols one at a time; `accepted` tells whether the prefix so far is in L"""
+
+    def __init__(self, base=None):
+        self.base = base or random.randrange(256, MODULUS - 1)
+        self.reset()
+
+    def reset(self):
+        self.length = 0
+        self.forward = 0  # s[0] * B^(k-1) + ... + s[k-1]
+        self.reverse = 0  # s[0] + s[1] * B + ... + s[k-1] * B^(k-1)
+        self.power = 1  # B^k
+        self.invalid_at = None  # position of the first symbol outside the alphabet
+
+    @property
+    def accepted(self):
+        return (self.invalid_at is None and self.length > 0 and not self.length % 2
+                and self.forward == self.reverse)
+
+    def feed(self, symbol):
+        """Read one symbol and return whether the prefix is now in L"""
+        value = _SYMBOL_VALUE.get(symbol)
+        if value is None and self.invalid_at is None:
+            self.invalid_at = self.length
+        if self.invalid_at is None:
+            self.forward = (self.forward * self.base + value) % MODULUS
+            self.reverse = (self.reverse + value * self.power) % MODULUS
+            self.power = self.power * self.base % MODULUS
+        self.length += 1
+        return self.accepted
+
+    def feed_chunk(self, chunk):
+        """Read a string of symbols, yielding the position after each accepted prefix"""
+        if self.invalid_at is not None:
+            self.length += len(chunk)
+            return
+        base, values = self.base, _SYMBOL_VALUE
+        forward, reverse, power, length = self.forward, self.reverse, self.power, self.length
+        end = length + len(chunk)
+        try:
+            for symbol in chunk:
+                value = values.get(symbol)
+                if value is None:
+                    self.invalid_at = length
+                    length = end
+                    break
+                forward = (forward * base + value) % MODULUS
+                reverse = (reverse + value * power) % MODULUS
+                power = power * base % MODULUS
+                length += 1
+                if forward == reverse and not length % 2:
+                    yield length
+        finally:
+            self.forward, self.reverse, self.power, self.length = forward, reverse, power, length
+
+
+def read_chunks(source, chunk_size=CHUNK_SIZE):
+    """Chunks of a file-like object as they arrive, or the items of any other iterable of strings"""
+    if not hasattr(source, "read"):
+        yield from source
+        return
+    # read(n) of a text stream waits for n characters or EOF; read1() of its
+    # buffer returns as soon as a pipe has any data, up to n bytes
+    raw = getattr(source, "buffer", source)
+    if not hasattr(raw, "read1"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    decoder = codecs.getincrementaldecoder(getattr(source, "encoding", None) or "utf-8")(
+        getattr(source, "errors", None) or "strict")
+    while True:
+        data = raw.read1(chunk_size)
+        chunk = decoder.decode(data, final=not data)
+        if chunk:
+            yield chunk
+        if not data:
+            return
+
+
+def stream(source, recognizer=None):
+    """Yield the length of every accepted prefix of a stream.
+
+    `source` is a file-like object (a pipe, a socket's makefile(), ...) or an
+    iterable of strings such as a generator of single symbols. Whitespace is
+    ignored so line-oriented producers can be piped in directly.
+    """
+    recognizer = recognizer or OnlineRecognizer()
+    for chunk in read_chunks(source):
+        chunk = "".join(chunk.split())
+        yield from recognizer.feed_chunk(chunk)
+        if recognizer.invalid_at is not None:
+            return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report every prefix of a stream that is in ww^r")
+    parser.add_argument("file", nargs="?", help="input file (default: stdin)")
+    parser.add_argument("--all", action="store_true", help="print a verdict for every prefix")
+    args = parser.parse_args(argv)
+
+    source = open(args.file, encoding="utf-8") if args.file else sys.stdin
+    recognizer = OnlineRecognizer()
+    try:
+        if args.all:
+            for chunk in read_chunks(source):
+                for symbol in "".join(chunk.split()):
+                    verdict = recognizer.feed(symbol)
+                    print(f"{recognizer.length}\t{'accepted' if verdict else 'rejected'}")
+                sys.stdout.flush()
+        else:
+            for length in stream(source, recognizer):
+                print(f"prefix of length {length} accepted", flush=True)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    if recognizer.invalid_at is not None:
+        print(f"invalid symbol at position {recognizer.invalid_at}; longer prefixes can not be accepted",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Instrumentation of the visualizer's handlers and canvas.
+
+A Profiler wraps selected methods of an object with timers and the item
+creating/deleting methods of a canvas with counters, so slow redraws can be
+attributed to a handler and to the number of items it churns. Timings and
+created items are always collected; a profiling session additionally counts
+deleted items (which takes an extra canvas query per delete), records every
+handler call for a Chrome trace (chrome://tracing, Perfetto) and runs
+cProfile for a pstats file. Sessions can be exported after they are
+stopped, and the pstats file browsed with:
+
+    python3 -m pstats session.prof
+
+ProfilerOverlay shows FPS, ms per step and the canvas item count on the
+canvas itself.
+"""
+import cProfile
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+MAX_EVENTS = 200000  # handler calls kept for the Chrome trace of a session
+OVERLAY_MS = 500
+WINDOW = 1.0  # seconds over which FPS and ms per step are averaged
+
+CREATE_METHODS = ("create_line", "create_rectangle", "create_oval", "create_text", "create_polygon",
+                  "create_arc", "create_image", "create_window")
+
+
+class HandlerStats:
+    __slots__ = ("calls", "total", "longest", "created", "deleted")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.created = 0
+        self.deleted = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Profiler:
+    def __init__(self, frame_handler="draw_pda", step_handlers=("process_step", "auto_step")):
+        self.frame_handler = frame_handler
+        self.step_handlers = step_handlers
+        self.stats = collections.defaultdict(HandlerStats)
+        self.created = 0
+        self.deleted = 0
+        self.frames = collections.deque()  # end times of recent frames
+        self.steps = collections.deque()  # (end time, duration) of recent steps
+        self.events = None  # handler calls of the last session
+        self.profile = None  # cProfile.Profile of the last session
+        self.recording = False
+        self.started = time.perf_counter()
+
+    # Instrumentation
+    def instrument(self, obj, names):
+        """Replace obj.name for each name with a timed wrapper"""
+        for name in names:
+            setattr(obj, name, self.timed(name, getattr(obj, name)))
+
+    def timed(self, name, function):
+        stats = self.stats[name]
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            created, deleted = self.created, self.deleted
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                elapsed = end - start
+                stats.calls += 1
+                stats.total += elapsed
+                stats.longest = max(stats.longest, elapsed)
+                stats.created += self.created - created
+                stats.deleted += self.deleted - deleted
+                if name == self.frame_handler:
+                    self.frames.append(end)
+                elif name in self.step_handlers:
+                    self.steps.append((end, elapsed))
+                if self.recording:
+                    self.events.append((name, start, elapsed, threading.get_ident()))
+        return wrapper
+
+    def watch_canvas(self, canvas):
+        """Count the items a canvas creates and deletes"""
+        def counted_create(create):
+            @functools.wraps(create)
+            def wrapper(*args, **kwargs):
+                self.created += 1
+                return create(*args, **kwargs)
+            return wrapper
+
+        for name in CREATE_METHODS:
+            if hasattr(canvas, name):
+                setattr(canvas, name, counted_create(getattr(canvas, name)))
+
+        delete = canvas.delete
+
+        @functools.wraps(delete)
+        def counted_delete(*tags_or_ids):
+            if self.recording:
+                for tag_or_id in tags_or_ids:
+                    self.deleted += len(canvas.find_all() if tag_or_id == "all" else canvas.find_withtag(tag_or_id))
+            return delete(*tags_or_ids)
+        canvas.delete = counted_delete
+
+    # Live figures
+    def _trim(self, now):
+        while self.frames and self.frames[0] < now - WINDOW:
+            self.frames.popleft()
+        while self.steps and self.steps[0][0] < now - WINDOW:
+            self.steps.popleft()
+
+    def fps(self):
+        now = time.perf_counter()
+        self._trim(now)
+        return len(self.frames) / WINDOW
+
+    def ms_per_step(self):
+        self._trim(time.perf_counter())
+        if not self.steps:
+            return 0.0
+        return sum(duration for _, duration in self.steps) / len(self.steps) * 1000
+
+    def summary(self):
+        """Handlers by total time, as lines of text"""
+        lines = [f"{'handler':<20} {'calls':>8} {'total ms':>10} {'mean ms':>9} {'max ms':>9} "
+                 f"{'+items':>8} {'-items':>8}"]
+        for name, stats in sorted(self.stats.items(), key=lambda item: -item[1].total):
+            if not stats.calls:
+                continue
+            lines.append(f"{name:<20} {stats.calls:>8} {stats.total * 1000:>10.1f} "
+                         f"{stats.total / stats.calls * 1000:>9.3f} {stats.longest * 1000:>9.3f} "
+                         f"{stats.created:>8} {stats.deleted:>8}")
+        return lines
+
+    # Sessions
+    def start_session(self):
+        self.events = collections.deque(maxlen=MAX_EVENTS)
+        for stats in self.stats.values():
+            stats.__init__()  # the wrappers hold on to these objects
+        # Only one profiler can be active; a new session replaces the old one
+        self.stop_session()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        self.recording = True
+
+    def stop_session(self):
+        if self.recording:
+            self.profile.disable()
+            self.recording = False
+
+    def export_pstats(self, path):
+        self.stop_session()
+        self.profile.dump_stats(path)
+
+    def export_chrome_trace(self, path):
+        """Write the handler calls of the session in the Chrome trace event format"""
+        self.stop_session()
+        pid = os.getpid()
+        events = [{"name": name, "cat": "handler", "ph": "X", "pid": pid, "tid": tid,
+                   "ts": (start - self.started) * 1e6, "dur": elapsed * 1e6}
+                  for name, start, elapsed, tid in self.events or ()]
+        with open(path, "w") as output:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, output)
+
+
+class ProfilerOverlay:
+    """Periodically updated text in the corner of a canvas"""
+
+    def __init__(self, root, canvas, profiler):
+        self.root = root
+        self.canvas = canvas
+        self.profiler = profiler
+        self.item = None
+        self.after_id = None
+
+    @property
+    def shown(self):
+        return self.after_id is not None
+
+    def toggle(self):
+        if self.shown:
+            self.hide()
+        else:
+            self.update()
+
+    def hide(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.canvas.delete("overlay")
+        self.item = None
+
+    def update(self):
+        canvas = self.canvas
+        profiler = self.profiler
+        # The item is gone after the renderer cleared the canvas
+        if self.item is None or not canvas.find_withtag("overlay"):
+            self.item = canvas.create_text(0, 0, anchor="ne", font=("Courier", 9), fill="#aa0000",
+                                           tags="overlay")
+        draw = profiler.stats.get(profiler.frame_handler)
+        if not draw or not draw.calls:
+            redraw = "no redraws"
+        elif profiler.recording:
+            redraw = f"+{draw.created}/-{draw.deleted} items in {draw.calls} redraws"
+        else:
+            redraw = f"+{draw.created} items in {draw.calls} redraws"
+        text = (f"{profiler.fps():.0f} FPS | {profiler.ms_per_step():.3f} ms/step | "
+                f"{len(canvas.find_all())} items\n{redraw}")
+        if profiler.recording:
+            text += "\n● recording session"
+        canvas.coords(self.item, canvas.winfo_width() - 10, 10)
+        canvas.itemconfigure(self.item, text=text)
+        self.after_id = self.root.after(OVERLAY_MS, self.update)
@@ -0,0 +1,597 @@
+import math
+
+import npda
+
+# Colors
+HIGHLIGHT_COLOR = "#ff9999"
+READ_COLOR = "#aaffaa"
+HEAD_COLOR = "#ffaaaa"
+STACK_COLOR = "#aaddff"
+BOTTOM_COLOR = "#dddddd"
+INFO_COLOR = "#ffffcc"
+LIVE_BRANCH_COLOR = "#22aa22"
+SELECTED_BRANCH_COLOR = "#2255ff"
+PRUNED_BRANCH_COLOR = "#bbbbbb"
+
+STATE_RADIUS = 30
+CELL_WIDTH = 30
+MIN_CELL_WIDTH = 12
+MAX_CELL_WIDTH = 60
+STACK_CELL_HEIGHT = 25
+
+INFO_TEXT = {
+    npda.Q0: ("State q0 (Pushing Phase)",
+              "• Continue pushing symbols to stack",
+              "• Or select center and transition to q1"),
+    npda.Q1: ("State q1 (Matching Phase)",
+              "• Read input and compare with stack top",
+              "• Pop matching symbols from stack"),
+}
+
+
+class PDARenderer:
+    """Draws the NPDA on a canvas and keeps its items alive between steps.
+
+    The machine diagram is created once per canvas size and tagged "static".
+    Each call to render() only touches the items whose appearance depends on
+    the part of the configuration that changed: the highlighted state, the
+    tape cells around the read head, the top of the stack and the info box.
+
+    The tape and the stack are windowed: only the cells that fit on the canvas
+    exist as items, and they are relabelled when the window moves. A minimap
+    above the tape shows where the window and the read head are in the whole
+    input, so the number of items depends on the canvas size, not the input.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.size = None
+        self.items = {}
+        self.static_items = []
+        self.relayout_index = None
+        self.state = None
+        self.machine = None  # machine.Machine drawn instead of the palindrome NPDA
+        # Tape window: slots are (rectangle, text) pairs showing input[offset:]
+        self.cell_width = CELL_WIDTH
+        self.tape_string = None
+        self.tape_slots = []
+        self.tape_offset = 0
+        self.tape_start_x = 0
+        self.position = None
+        # Center markers between tape cells while all branches are explored
+        self.branch_markers = []  # [line, shown look] per cell boundary in the window
+        self.explorer = None
+        self.selected_center = None
+        # Stack window: slots above Z₀ as [rectangle, text, shown symbol]
+        self.stack_slots = []
+        self.stack_depth = 0
+
+    def invalidate(self):
+        """Forget every item so the next render() draws from scratch"""
+        self.canvas.delete("all")
+        self.size = None
+        self.static_items = []
+        self.state = None
+        self.tape_string = None
+        self.tape_slots = []
+
+    def set_machine(self, machine):
+        """Draw a loaded machine.Machine, or the palindrome NPDA for None"""
+        self.machine = machine
+        self.invalidate()
+
+    def refresh(self):
+        """Redraw the tape window and stack cells on the next render, e.g. after seeking"""
+        self.position = None
+        self.stack_depth = 0
+        for slot in self.stack_slots:
+            slot[2] = ""  # never equal to a shown label, so every slot is rewritten
+
+    def render(self, width, height, state, input_string, position, stack):
+        if (width, height) != self.size:
+            self.build(width, height)
+        if input_string is not self.tape_string:
+            self.build_tape(input_string)
+        self.update_state(state)
+        self.update_tape(state, position)
+        self.update_stack(state, stack)
+
+    def build(self, width, height):
+        """Lay out the static diagram and recreate the size dependent windows.
+
+        The static items are created on the first call only. Later calls (on
+        resize) recompute the layout and move the cached items with coords()
+        instead of deleting and recreating them.
+        """
+        self.size = (width, height)
+        self.relayout_index = 0 if self.static_items else None
+        self.build_static(width, height)
+        self.relayout_index = None
+        self.build_stack(width, height)
+
+        # Rebuild the tape window for the new width around the same position
+        input_string, position = self.tape_string, self.position
+        self.build_tape(input_string)
+        if position is not None and self.tape_slots:
+            self.position = position
+            self.tape_offset = self.clamp_offset(position - len(self.tape_slots) // 2)
+            self.fill_window(self.state)
+            self.update_head(self.state)
+
+    def static_item(self, kind, *coords, **options):
+        """Create a static item, or move the cached one when relaying out"""
+        if len(coords) == 1:
+            coords = tuple(coords[0])
+        if self.relayout_index is not None:
+            item = self.static_items[self.relayout_index]
+            self.relayout_index += 1
+            self.canvas.coords(item, *coords)
+            return item
+        item = getattr(self.canvas, "create_" + kind)(*coords, tags="static", **options)
+        self.static_items.append(item)
+        return item
+
+    def build_static(self, width, height):
+        if self.machine is None:
+            self.build_diagram(width, height)
+        else:
+            self.build_machine_diagram(width, height)
+
+        # Draw a vertical separator
+        self.static_item("line", width * 0.7, height * 0.15, width * 0.7, height * 0.85,
+                         dash=(10, 5), fill="gray")
+
+        # Draw the stack frame - on the right of the separator
+        stack_width = 100
+        stack_x = width * 0.85
+        stack_base_y = height * 0.85
+        self.static_item("rectangle", stack_x - stack_width/2, height * 0.3,
+                         stack_x + stack_width/2, stack_base_y, outline="black", width=2)
+        self.static_item("text", stack_x, height * 0.25, text="Stack", font=("Arial", 12, "bold"))
+
+        # State-specific information box; its text changes with the state
+        info_x = width * 0.35
+        info_y = height * 0.85
+        self.items["info_box"] = self.static_item("rectangle", info_x - 180, info_y - 40,
+                                                  info_x + 180, info_y + 40,
+                                                  fill=INFO_COLOR, outline="black", state="hidden")
+        self.items["info_lines"] = [
+            self.static_item("text", info_x, info_y + dy, text="",
+                             font=("Arial", 10, "bold") if dy < 0 else ("Arial", 10))
+            for dy in (-20, 0, 20)
+        ]
+
+    def build_diagram(self, width, height):
+        # Draw states - using only 60% of width for PDA machine
+        r = STATE_RADIUS
+        q0_x, q0_y = width * 0.15, height * 0.5
+        q1_x, q1_y = width * 0.35, height * 0.5
+        q2_x, q2_y = width * 0.55, height * 0.5
+
+        # Draw PDA title
+        self.static_item("text", width * 0.35, height * 0.25, text="NPDA States and Transitions",
+                         font=("Arial", 12, "bold"))
+
+        # Draw states
+        for state, x, y, label in ((npda.Q0, q0_x, q0_y, "q0\n(push)"),
+                                   (npda.Q1, q1_x, q1_y, "q1\n(match)"),
+                                   (npda.Q2, q2_x, q2_y, "q2\n(accept)")):
+            self.items[state] = self.static_item("oval", x-r, y-r, x+r, y+r, fill="white",
+                                                 outline="black", width=2)
+            if state == npda.Q2:
+                # Double circle for accepting state
+                self.static_item("oval", x-r+5, y-r+5, x+r-5, y+r-5, outline="black", width=2)
+            self.static_item("text", x, y, text=label, font=("Arial", 12, "bold"))
+
+        # Draw transitions, labelled from the engine's transition table
+        labels = npda.edge_labels()
+
+        # q0 to q0 self loop (for pushing characters) - curved arrow above the state
+        self.draw_self_loop(q0_x, q0_y, r, 90, 135, 45,
+                            labels[(npda.Q0, npda.Q0)])
+
+        # q0 to q1 (nondeterministic transition - guess middle)
+        self.static_item("line", q0_x+r, q0_y, q1_x-r, q1_y, arrow="last", width=2)
+        self.static_item("text", (q0_x+q1_x)/2, q0_y-20, text=labels[(npda.Q0, npda.Q1)],
+                         font=("Arial", 10))
+
+        # q1 self loop (matching and popping) - curved arrow above the state
+        self.draw_self_loop(q1_x, q1_y, r, 90, 135, 45, labels[(npda.Q1, npda.Q1)])
+
+        # q1 to q2 (acceptance when stack is empty or just Z₀)
+        self.static_item("line", q1_x+r, q1_y, q2_x-r, q2_y, arrow="last", width=2)
+        self.static_item("text", (q1_x+q2_x)/2, q1_y-20, text=labels[(npda.Q1, npda.Q2)],
+                         font=("Arial", 10))
+
+    def build_machine_diagram(self, width, height):
+        """Draw a loaded machine at the positions of its (cached) automatic layout"""
+        machine = self.machine
+        r = STATE_RADIUS
+        left, top = width * 0.05, height * 0.35
+        span_x, span_y = width * 0.6, height * 0.4
+        positions = {state: (left + x * span_x, top + y * span_y)
+                     for state, (x, y) in machine.layout().items()}
+
+        self.static_item("text", width * 0.35, height * 0.25, text=machine.name,
+                         font=("Arial", 12, "bold"))
+
+        labels = machine.edge_labels()
+        for (state, next_state), label in labels.items():
+            x0, y0 = positions[state]
+            x1, y1 = positions[next_state]
+            if state == next_state:
+                self.draw_self_loop(x0, y0, r, 90, 135, 45, label)
+                continue
+            # Edges in both directions are drawn side by side
+            length = math.hypot(x1 - x0, y1 - y0)
+            ux, uy = (x1 - x0) / length, (y1 - y0) / length
+            shift = 8 if (next_state, state) in labels else 0
+            nx, ny = uy * shift, -ux * shift
+            self.static_item("line", x0 + ux * r + nx, y0 + uy * r + ny,
+                             x1 - ux * r + nx, y1 - uy * r + ny, arrow="last", width=2)
+            offset = shift + 12 + 8 * label.count("\n")  # clear the line with multi-line labels
+            self.static_item("text", (x0 + x1) / 2 + uy * offset, (y0 + y1) / 2 - ux * offset,
+                             text=label, font=("Arial", 10))
+
+        # Arrow into the start state
+        x, y = positions[machine.start]
+        self.static_item("line", x - r - 25, y, x - r, y, arrow="last", width=2)
+
+        for state in machine.states:
+            x, y = positions[state]
+            self.items[state] = self.static_item("oval", x-r, y-r, x+r, y+r, fill="white",
+                                                 outline="black", width=2)
+            if state in machine.accepting:
+                self.static_item("oval", x-r+5, y-r+5, x+r-5, y+r-5, outline="black", width=2)
+            self.static_item("text", x, y, text=state, font=("Arial", 11, "bold"))
+
+    def draw_self_loop(self, x, y, radius, start_angle, arc_angle, end_angle, label_text):
+        """Draw a self loop as a curved arrow pointing back to the same state"""
+        # Calculate control points for the curved arrow
+        start_angle_rad = math.radians(start_angle)
+        arc_angle_rad = math.radians(arc_angle)
+        end_angle_rad = math.radians(end_angle)
+
+        # Start and end points of the arrow (on the state circle)
+        start_x = x + radius * math.cos(start_angle_rad)
+        start_y = y - radius * math.sin(start_angle_rad)  # Negative because y increases downward
+        end_x = x + radius * math.cos(end_angle_rad)
+        end_y = y - radius * math.sin(end_angle_rad)
+
+        # Control point for the curve (above the state)
+        control_x = x + radius * math.cos(arc_angle_rad) * 1.5
+        control_y = y - radius * math.sin(arc_angle_rad) * 2  # Higher above state
+
+        # Draw the curved arrow
+        arrow_points = [start_x, start_y,
+                        control_x, control_y,
+                        end_x, end_y]
+        self.static_item("line", arrow_points, smooth=True, arrow="last", width=2)
+
+        # Draw the label slightly above the curve
+        self.static_item("text", control_x, control_y - 15, text=label_text, font=("Arial", 10))
+
+    def build_stack(self, width, height):
+        """Create the cells above Z₀ that fit inside the stack frame"""
+        canvas = self.canvas
+        canvas.delete("stack")
+        self.stack_slots = []
+        self.stack_depth = 0
+        stack_x = width * 0.85
+        stack_base_y = height * 0.85
+
+        # Bottom of the stack: a label while empty, a Z₀ cell otherwise
+        self.items["stack_empty"] = canvas.create_text(stack_x, stack_base_y - 20,
+                                                       text="Z₀ (Bottom)", font=("Arial", 10),
+                                                       tags="stack")
+        self.items["z0_cell"] = canvas.create_rectangle(stack_x - 20, stack_base_y - STACK_CELL_HEIGHT,
+                                                        stack_x + 20, stack_base_y,
+                                                        fill=BOTTOM_COLOR, outline="black",
+                                                        state="hidden", tags="stack")
+        self.items["z0_text"] = canvas.create_text(stack_x, stack_base_y - STACK_CELL_HEIGHT/2,
+                                                   text="Z₀", font=("Arial", 10, "bold"),
+                                                   state="hidden", tags="stack")
+        self.items["stack_depth"] = canvas.create_text(stack_x, stack_base_y + 12, text="",
+                                                       font=("Arial", 9), fill="gray",
+                                                       tags="stack")
+
+        capacity = max(2, int((stack_base_y - height * 0.3) // STACK_CELL_HEIGHT) - 1)
+        for i in range(capacity):
+            y_pos = stack_base_y - (i+2) * STACK_CELL_HEIGHT  # +2 to leave room for Z₀
+            rectangle = canvas.create_rectangle(stack_x - 20, y_pos,
+                                                stack_x + 20, y_pos + STACK_CELL_HEIGHT,
+                                                fill=STACK_COLOR, outline="black",
+                                                state="hidden", tags="stack")
+            text = canvas.create_text(stack_x, y_pos + STACK_CELL_HEIGHT/2, text="",
+                                      font=("Arial", 12, "bold"), state="hidden", tags="stack")
+            self.stack_slots.append([rectangle, text, None])
+
+    def update_state(self, state):
+        """Move the highlight to the current state and refresh the info box"""
+        if state == self.state:
+            return
+        canvas = self.canvas
+        if self.state is not None:
+            canvas.itemconfigure(self.items[self.state], fill="white")
+        canvas.itemconfigure(self.items[state], fill=HIGHLIGHT_COLOR)
+
+        lines = INFO_TEXT.get(state) if self.machine is None else None
+        canvas.itemconfigure(self.items["info_box"], state="normal" if lines else "hidden")
+        for item, text in zip(self.items["info_lines"], lines or ("", "", "")):
+            canvas.itemconfigure(item, text=text)
+        self.state = state
+
+    def build_tape(self, input_string):
+        """Create the cells of the tape window for a new input or zoom level"""
+        canvas = self.canvas
+        canvas.delete("tape")
+        self.tape_string = input_string
+        self.tape_slots = []
+        self.position = None
+        if not input_string:
+            return
+
+        width, height = self.size
+        tape_y = height * 0.15
+        cell_width = self.cell_width
+        visible = min(len(input_string), max(1, int((width - 40) // cell_width)))
+        self.tape_start_x = tape_start_x = (width - visible * cell_width) / 2
+        self.tape_offset = 0
+
+        # Draw the tape
+        canvas.create_rectangle(tape_start_x - 10, tape_y - 20,
+                                tape_start_x + visible * cell_width + 10,
+                                tape_y + 20, outline="black", width=2, tags="tape")
+
+        # Draw the cells of the window; their labels follow the window offset
+        font = ("Arial", max(7, min(12, int(cell_width * 0.4))), "bold")
+        for i in range(visible):
+            cell_x = tape_start_x + i * cell_width
+            rectangle = canvas.create_rectangle(cell_x, tape_y - 20, cell_x + cell_width, tape_y + 20,
+                                                fill="white", outline="black", tags="tape")
+            text = canvas.create_text(cell_x + cell_width/2, tape_y, text="", font=font, tags="tape")
+            self.tape_slots.append((rectangle, text))
+
+        # A marker on every cell boundary, i.e. every center guess in the window
+        self.branch_markers = [
+            [canvas.create_line(tape_start_x + i * cell_width, tape_y - 24,
+                                tape_start_x + i * cell_width, tape_y + 24,
+                                width=3, state="hidden", tags="tape"), None]
+            for i in range(visible + 1)
+        ]
+        self.items["branch_count"] = canvas.create_text(width * 0.02, height * 0.05, text="", anchor="w",
+                                                        font=("Arial", 10, "bold"), tags="tape")
+
+        # Number of symbols hidden on either side of the window
+        self.items["tape_left"] = canvas.create_text(tape_start_x - 14, tape_y, text="", anchor="e",
+                                                     font=("Arial", 9), fill="gray", tags="tape")
+        self.items["tape_right"] = canvas.create_text(tape_start_x + visible * cell_width + 14, tape_y,
+                                                      text="", anchor="w", font=("Arial", 9),
+                                                      fill="gray", tags="tape")
+
+        # Read head, moved with coords() as the input is consumed
+        self.items["head"] = canvas.create_line(0, 0, 0, 0, width=2, arrow="last",
+                                                state="hidden", tags="tape")
+        self.items["head_text"] = canvas.create_text(0, 0, text="Read Head", font=("Arial", 10),
+                                                     state="hidden", tags="tape")
+
+        # Minimap of the whole input, only needed when the tape does not fit
+        if visible < len(input_string):
+            map_y = tape_y - 32
+            canvas.create_rectangle(width * 0.1, map_y - 4, width * 0.9, map_y + 4,
+                                    fill="white", outline="gray", tags=("tape", "minimap"))
+            self.items["map_read"] = canvas.create_rectangle(width * 0.1, map_y - 4, width * 0.1, map_y + 4,
+                                                             fill=READ_COLOR, outline="",
+                                                             tags=("tape", "minimap"))
+            self.items["map_window"] = canvas.create_rectangle(0, map_y - 6, 0, map_y + 6,
+                                                               outline="red", width=2,
+                                                               tags=("tape", "minimap"))
+            self.items["map_head"] = canvas.create_line(0, map_y - 7, 0, map_y + 7, fill="black",
+                                                        width=2, tags=("tape", "minimap"))
+
+    def head_shown(self, state):
+        return self.machine is not None or state != npda.Q2
+
+    def cell_color(self, i, state, position):
+        if i == position and self.head_shown(state):
+            return HEAD_COLOR  # Current position
+        return READ_COLOR if i < position else "white"
+
+    def visible_range(self):
+        return range(self.tape_offset, self.tape_offset + len(self.tape_slots))
+
+    def update_tape(self, state, position):
+        """Recolor only the visible cells between the previous and the current head position"""
+        if not self.tape_slots:
+            return
+        canvas = self.canvas
+        previous = self.position
+        window = self.visible_range()
+
+        if previous is None or (previous in window and position not in window
+                                and position < len(self.tape_string)):
+            # Keep the read head on screen while it moves through the input
+            self.tape_offset = self.clamp_offset(position - len(self.tape_slots) // 2)
+            self.position = position
+            self.fill_window(state)
+        else:
+            first = max(min(previous, position), window.start)
+            last = min(max(previous, position) + 1, window.stop)
+            for i in range(first, last):
+                canvas.itemconfigure(self.tape_slots[i - window.start][0],
+                                     fill=self.cell_color(i, state, position))
+            self.position = position
+            self.update_minimap()
+        self.update_head(state)
+
+    def clamp_offset(self, offset):
+        return max(0, min(offset, len(self.tape_string) - len(self.tape_slots)))
+
+    def fill_window(self, state):
+        """Relabel every cell of the window after it moved"""
+        canvas = self.canvas
+        offset = self.tape_offset
+        for i, (rectangle, text) in enumerate(self.tape_slots):
+            canvas.itemconfigure(rectangle, fill=self.cell_color(offset + i, state, self.position))
+            canvas.itemconfigure(text, text=self.tape_string[offset + i])
+        hidden_right = len(self.tape_string) - offset - len(self.tape_slots)
+        canvas.itemconfigure(self.items["tape_left"], text=f"◀ {offset}" if offset else "")
+        canvas.itemconfigure(self.items["tape_right"], text=f"{hidden_right} ▶" if hidden_right else "")
+        self.update_minimap()
+        self.update_branches(self.explorer, self.selected_center)
+
+    def update_head(self, state):
+        canvas = self.canvas
+        position = self.position
+        if position in self.visible_range() and self.head_shown(state):
+            tape_y = self.size[1] * 0.15
+            head_x = self.tape_start_x + (position - self.tape_offset + 0.5) * self.cell_width
+            canvas.coords(self.items["head"], head_x, tape_y + 25, head_x, tape_y + 40)
+            canvas.coords(self.items["head_text"], head_x, tape_y + 50)
+            canvas.itemconfigure(self.items["head"], state="normal")
+            canvas.itemconfigure(self.items["head_text"], state="normal")
+        else:
+            canvas.itemconfigure(self.items["head"], state="hidden")
+            canvas.itemconfigure(self.items["head_text"], state="hidden")
+
+    def update_branches(self, explorer, selected_center=None):
+        """Mark the live and pruned center guesses of a branches.BranchExplorer in the window"""
+        self.explorer = explorer
+        self.selected_center = selected_center
+        if not self.tape_slots:
+            return
+        canvas = self.canvas
+        branches = explorer.branches if explorer is not None else {}
+        for i, marker in enumerate(self.branch_markers):
+            branch = branches.get(self.tape_offset + i)
+            if branch is None:
+                look = None
+            elif branch.alive or branch.result.accepted:
+                look = "selected" if branch.center == selected_center else "live"
+            else:
+                look = "pruned"
+            if look == marker[1]:
+                continue
+            if look is None:
+                canvas.itemconfigure(marker[0], state="hidden")
+            else:
+                color = {"selected": SELECTED_BRANCH_COLOR, "live": LIVE_BRANCH_COLOR,
+                         "pruned": PRUNED_BRANCH_COLOR}[look]
+                canvas.itemconfigure(marker[0], state="normal", fill=color,
+                                     width=1 if look == "pruned" else 3)
+            marker[1] = look
+
+        if explorer is None:
+            text = ""
+        else:
+            text = (f"Live branches: {explorer.live_count} "
+                    f"({len(explorer.branches)} spawned, {len(explorer.accepted)} accepted)")
+        canvas.itemconfigure(self.items["branch_count"], text=text)
+
+    def update_minimap(self):
+        if "map_window" not in self.items or len(self.tape_slots) == len(self.tape_string):
+            return
+        width, height = self.size
+        map_y = height * 0.15 - 32
+        left, span = width * 0.1, width * 0.8
+        n = len(self.tape_string)
+        window_x0 = left + span * self.tape_offset / n
+        window_x1 = left + span * (self.tape_offset + len(self.tape_slots)) / n
+        head_x = left + span * min(self.position, n) / n
+        self.canvas.coords(self.items["map_read"], left, map_y - 4, head_x, map_y + 4)
+        self.canvas.coords(self.items["map_window"], window_x0, map_y - 6, window_x1, map_y + 6)
+        self.canvas.coords(self.items["map_head"], head_x, map_y - 7, head_x, map_y + 7)
+
+    # Viewport navigation, bound to the mouse by the visualizer
+    def scroll_tape(self, cells):
+        """Move the tape window by a number of cells"""
+        if not self.tape_slots:
+            return
+        offset = self.clamp_offset(self.tape_offset + cells)
+        if offset != self.tape_offset:
+            self.tape_offset = offset
+            self.fill_window(self.state)
+            self.update_head(self.state)
+
+    def scroll_to(self, x):
+        """Center the tape window on the input position under x on the minimap"""
+        if not self.tape_slots or "map_window" not in self.items:
+            return
+        width = self.size[0]
+        fraction = min(max((x - width * 0.1) / (width * 0.8), 0.0), 1.0)
+        target = int(fraction * len(self.tape_string)) - len(self.tape_slots) // 2
+        self.scroll_tape(self.clamp_offset(target) - self.tape_offset)
+
+    def center_on(self, position):
+        """Move the tape window so that it is centered on an input position"""
+        if not self.tape_slots:
+            return
+        self.scroll_tape(self.clamp_offset(position - len(self.tape_slots) // 2) - self.tape_offset)
+
+    def zoom(self, factor):
+        """Change the cell width; the window is rebuilt around the same position"""
+        cell_width = max(MIN_CELL_WIDTH, min(MAX_CELL_WIDTH, round(self.cell_width * factor)))
+        if cell_width == self.cell_width or not self.tape_string:
+            self.cell_width = cell_width
+            return
+        self.cell_width = cell_width
+        center = self.tape_offset + len(self.tape_slots) // 2
+        position = self.position
+        self.build_tape(self.tape_string)
+        self.position = position
+        self.tape_offset = self.clamp_offset(center - len(self.tape_slots) // 2)
+        self.fill_window(self.state)
+        self.update_head(self.state)
+
+    def update_stack(self, state, stack):
+        """Show the top of the stack in the fixed set of cells above Z₀.
+
+        While the stack fits only the slots at its top change. Once it is
+        deeper than the frame the lowest slot summarizes the hidden symbols.
+        """
+        canvas = self.canvas
+        slots = self.stack_slots
+        capacity = len(slots)
+        depth = len(stack)
+
+        if depth <= capacity:
+            # Slots below both the old and the new top are unchanged
+            first = max(0, min(self.stack_depth, depth) - 1) if self.stack_depth <= capacity else 0
+            labels = ((i, stack[i] if i < depth else None) for i in range(first, capacity))
+        else:
+            hidden = depth - capacity + 1
+            labels = ((i, stack[hidden + i - 1] if i else f"+{hidden}") for i in range(capacity))
+
+        for i, label in labels:
+            slot = slots[i]
+            if slot[2] == label:
+                if label is None and i >= max(depth, self.stack_depth):
+                    break  # everything above is already hidden
+                continue
+            rectangle, text, shown = slot
+            if label is None:
+                canvas.itemconfigure(rectangle, state="hidden")
+                canvas.itemconfigure(text, state="hidden")
+            else:
+                if not shown:
+                    canvas.itemconfigure(rectangle, state="normal")
+                    canvas.itemconfigure(text, state="normal")
+                summary = depth > capacity and i == 0
+                canvas.itemconfigure(rectangle, fill=BOTTOM_COLOR if summary else STACK_COLOR)
+                canvas.itemconfigure(text, text=label)
+            slot[2] = label
+        self.stack_depth = depth
+
+        # A loaded machine keeps its own bottom symbol on the stack
+        empty = not depth
+        bottom = not empty and self.machine is None
+        if self.machine is not None:
+            empty_text = "(empty)"
+        else:
+            empty_text = "ε (Epsilon)" if state == npda.Q2 else "Z₀ (Bottom)"
+        canvas.itemconfigure(self.items["stack_empty"], state="normal" if empty else "hidden",
+                             text=empty_text)
+        canvas.itemconfigure(self.items["z0_cell"], state="normal" if bottom else "hidden")
+        canvas.itemconfigure(self.items["z0_text"], state="normal" if bottom else "hidden")
+        canvas.itemconfigure(self.items["stack_depth"],
+                             text=f"depth {depth}" if depth > capacity else "")
@@ -0,0 +1,95 @@
+"""Frame-paced stepping of automaton runs on the Tk event loop."""
+import time
+
+FRAME_MS = 16  # one frame at about 60 Hz; also the GUI's polling and redraw interval
+MAX_SPEED_BUDGET = 0.010  # seconds of each frame spent stepping in max speed mode
+CHECK_EVERY = 256  # steps between clock reads in max speed mode
+
+
+class StepScheduler:
+    """Runs automaton steps at a target rate measured against a monotonic clock.
+
+    Instead of sleeping a fixed interval after each step (which makes the real
+    interval step time + render time + interval), each frame works out how many
+    steps are due since the run started and performs all of them, then renders
+    only the final configuration once. In max speed mode every frame steps for
+    a fixed time budget and leaves the rest of the frame to Tk.
+
+    `step` performs one move and returns False when the run is over; `render`
+    draws the current configuration; `finished` is called once at the end.
+    """
+
+    def __init__(self, root, step, render, finished=None):
+        self.root = root
+        self.step = step
+        self.render = render
+        self.finished = finished
+        self.rate = 1.0  # steps per second
+        self.max_speed = False
+        self.after_id = None
+        self.started = 0.0
+        self.steps_done = 0
+        self.total_steps = 0
+
+    @property
+    def running(self):
+        return self.after_id is not None
+
+    def start(self):
+        if self.running:
+            return
+        self.rebase()
+        self.total_steps = 0
+        self.after_id = self.root.after(0, self.frame)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def rebase(self):
+        """Count due steps from now on, e.g. after the rate changed"""
+        self.started = time.monotonic()
+        self.steps_done = 0
+
+    def set_rate(self, rate, max_speed=None):
+        self.rate = rate
+        if max_speed is not None:
+            self.max_speed = max_speed
+        self.rebase()
+
+    def frame(self):
+        self.after_id = None
+        now = time.monotonic()
+        alive = True
+        stepped = 0
+
+        if self.max_speed:
+            deadline = now + MAX_SPEED_BUDGET
+            while alive:
+                alive = self.step()
+                stepped += 1
+                if stepped % CHECK_EVERY == 0 and time.monotonic() >= deadline:
+                    break
+        else:
+            due = int((now - self.started) * self.rate) - self.steps_done
+            while alive and stepped < due:
+                alive = self.step()
+                stepped += 1
+            self.steps_done += stepped
+
+        self.total_steps += stepped
+        if stepped:
+            self.render()
+        if not alive:
+            if self.finished:
+                self.finished()
+            return
+
+        if self.max_speed:
+            delay = 1
+        else:
+            # Sleep until the next step is due, but wake at least once per frame
+            next_due = self.started + (self.steps_done + 1) / self.rate
+            delay = int(min(max(next_due - time.monotonic(), 0.001), FRAME_MS / 1000) * 1000)
+        self.after_id = self.root.after(max(delay, 1), self.frame)
@@ -0,0 +1,179 @@
+"""Cross-checks of the fast deciders against the step-by-step NPDA.
+
+Run from the repository root with `python3 -m pytest`.
+"""
+import io
+import itertools
+import random
+
+import pytest
+
+import fastpath
+import npda
+import online
+import vectorized
+from mapped_input import MappedTape
+from tracefile import Trace
+
+EXHAUSTIVE_LENGTH = 10
+
+
+def exhaustive_strings(max_length=EXHAUSTIVE_LENGTH):
+    return ["".join(symbols) for n in range(1, max_length + 1)
+            for symbols in itertools.product(npda.ALPHABET, repeat=n)]
+
+
+def simulate(string, center):
+    """Decide a string one NPDA step at a time, guessing the center at `center`"""
+    engine = npda.PalindromeNPDA(string)
+    for _ in range(center):
+        engine.step()
+    engine.choose_center()
+    while engine.step() == npda.CONTINUE:
+        pass
+    engine.result.center = center
+    return engine.result
+
+
+def fastpath_samples(count=2000, max_half=64, seed=0):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        half = "".join(rng.choice(npda.ALPHABET) for _ in range(rng.randint(1, max_half)))
+        samples.append(half + half[::-1] if rng.random() < 0.5 else half)
+    return samples
+
+
+@pytest.mark.parametrize("string", exhaustive_strings() + fastpath_samples())
+def test_fastpath(string):
+    radii = fastpath.even_radii(string)
+    fast = fastpath.decide(string, radii)
+    assert fast.as_dict() == simulate(string, fast.center).as_dict()
+    # The accepting center must be the only center whose branch accepts
+    center = fastpath.accepting_center(string, radii)
+    accepting = [c for c in range(len(string) + 1) if simulate(string, c).accepted]
+    assert accepting == ([] if center is None else [center])
+
+
+def test_fastpath_rejects_empty_string():
+    assert not fastpath.decide("").accepted
+    assert fastpath.accepting_center("") is None
+
+
+def trace_samples(count=200, max_length=12, seed=0):
+    rng = random.Random(seed)
+    samples = ["a", "ab", "aa", "abab", "abba", "aabbaa", "abaaba", "abbba"]
+    for _ in range(count):
+        samples.append("".join(rng.choice(npda.ALPHABET) for _ in range(rng.randint(1, max_length))))
+    return samples
+
+
+@pytest.mark.parametrize("interval", (1, 2, 3, 5, 256))
+@pytest.mark.parametrize("string", trace_samples())
+def test_trace_seeks_to_every_step(string, interval):
+    """Seeking restores the configuration the engine reached after every step"""
+    for center in range(len(string) + 1):
+        engine = npda.PalindromeNPDA(string)
+        engine.trace = Trace(string, interval)
+        reached = [engine.config.copy()]
+        status = npda.CONTINUE
+        while status == npda.CONTINUE:
+            if len(reached) - 1 == center:
+                engine.choose_center()
+                if engine.trace.steps == len(reached):
+                    reached.append(engine.config.copy())
+            status = engine.step()
+            reached.append(engine.config.copy())
+        trace = engine.trace
+        assert trace.steps == len(reached) - 1
+        for step, config in enumerate(reached):
+            assert trace.configuration_at(step) == config, (center, step)
+        assert trace.result.as_dict() == engine.result.as_dict()
+
+
+def online_samples(count=2000, max_half=32, seed=0):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        half = "".join(rng.choice(npda.ALPHABET) for _ in range(rng.randint(1, max_half)))
+        tail = "".join(rng.choice(npda.ALPHABET) for _ in range(rng.randint(0, 4)))
+        samples.append(half + half[::-1] + tail)
+    return samples
+
+
+@pytest.mark.parametrize("string", online_samples())
+def test_online(string):
+    """Every prefix verdict, fed symbol by symbol or streamed, matches npda.run"""
+    expected = [k for k in range(1, len(string) + 1) if npda.run(string[:k]).accepted]
+    recognizer = online.OnlineRecognizer()
+    assert [k for k, symbol in enumerate(string, 1) if recognizer.feed(symbol)] == expected
+    assert list(online.stream(iter(string))) == expected
+    text = io.TextIOWrapper(io.BytesIO(string.encode("utf-8")), encoding="utf-8")
+    assert list(online.stream(text)) == expected
+
+
+def mapped_samples(count=500, max_half=20, seed=0):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        half = "".join(rng.choice(npda.ALPHABET) for _ in range(rng.randint(0, max_half)))
+        string = half + rng.choice(("", "a", "b")) + half[::-1]
+        if string and rng.random() < 0.5:
+            i = rng.randrange(len(string))
+            string = string[:i] + rng.choice(npda.ALPHABET) + string[i + 1:]
+        if string:
+            samples.append((string, rng.choice(("", "\n"))))
+    return samples
+
+
+@pytest.mark.parametrize("string, trailing", mapped_samples())
+def test_mapped_input(tmp_path, string, trailing):
+    """Chunks smaller than the input decide like npda.run; trailing whitespace is not read"""
+    path = tmp_path / "tape.txt"
+    path.write_text(string + trailing)
+    expected = npda.run(string).as_dict()
+    with MappedTape(str(path)) as tape:
+        assert len(tape) == len(string)
+        assert tape[:] == string
+        for chunk_size in (1, 3, 64):
+            assert tape.decide(chunk_size=chunk_size).as_dict() == expected
+
+
+def test_mapped_input_rejects_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("\n")
+    with MappedTape(str(path)) as tape, pytest.raises(ValueError):
+        tape.decide()
+
+
+def vectorized_batches(count=3000, max_half=12, seed=0):
+    """Samples grouped into batches of equal length, including invalid strings"""
+    rng = random.Random(seed)
+    by_length = {}
+    for _ in range(count):
+        half = "".join(rng.choice(npda.ALPHABET) for _ in range(rng.randint(0, max_half)))
+        string = half + rng.choice(("", "a", "b")) + half[::-1]
+        if string and rng.random() < 0.6:
+            i = rng.randrange(len(string))
+            string = string[:i] + rng.choice(npda.ALPHABET + "c") + string[i + 1:]
+        by_length.setdefault(len(string), []).append(string)
+    return list(by_length.values())
+
+
+@pytest.mark.parametrize("backend", ("packed", "numpy"))
+def test_vectorized(backend):
+    if backend == "numpy":
+        if vectorized.numpy is None:
+            pytest.skip("NumPy is not installed")
+        decide = lambda batch: vectorized.decide_matrix(vectorized.pack(batch))
+    else:
+        decide = vectorized.decide_packed
+    for batch in vectorized_batches():
+        verdicts = decide(batch)
+        for row, string in enumerate(batch):
+            if npda.validate(string):
+                assert not verdicts.valid[row], string
+            else:
+                assert verdicts.valid[row], string
+                assert bool(verdicts.accepted[row]) == npda.run(string).accepted, string
+                assert verdicts.result(row).as_dict() == npda.run(string).as_dict(), string
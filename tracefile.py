@@ -0,0 +1,269 @@
+"""Execution traces of NPDA runs with a compact on-disk format.
+
+Every move of a PalindromeNPDA with a Trace attached is stored as a small
+delta (state after the move, whether the head advanced, whether the top was
+popped, and the pushed symbols). Full configurations are kept as keyframes at
+regular intervals, so any step can be restored by a binary search over the
+keyframes followed by replaying at most one interval of deltas, without
+re-simulating from the start.
+
+Traces load without Tk, so runs can be replayed and compared in bulk:
+
+    python3 tracefile.py record abba -o abba.trace
+    python3 tracefile.py show abba.trace --step 3
+    python3 tracefile.py diff base.trace other1.trace other2.trace
+"""
+import argparse
+import bisect
+import json
+import struct
+import sys
+
+import npda
+
+MAGIC = b"NPDATRC1"
+MIN_KEYFRAME_INTERVAL = 256
+KEYFRAME_BUDGET = 16 * 1024 * 1024  # bytes of stack snapshots kept per trace
+
+# Delta op byte: bits 0-1 state code, bit 2 head advanced, bit 3 top popped,
+# bit 4 run halted, bits 5-7 number of pushed symbols that follow
+_ADVANCED = 0x04
+_POPPED = 0x08
+_HALTED = 0x10
+_PUSH_SHIFT = 5
+_MAX_PUSH = 7
+
+_HEADER = struct.Struct("<Q")
+_KEYFRAME = struct.Struct("<QQBQQ")
+
+
+def default_keyframe_interval(input_length):
+    """Interval keeping the stack snapshots of a whole run within the budget"""
+    # A run of n symbols has about n steps with an average stack of n / 4
+    return max(MIN_KEYFRAME_INTERVAL, input_length * input_length // (4 * KEYFRAME_BUDGET) + 1)
+
+
+class Trace:
+    """Recorded moves of one run, seekable to any step"""
+
+    def __init__(self, input_string, keyframe_interval=None):
+        self.input_string = input_string
+        self.keyframe_interval = keyframe_interval or default_keyframe_interval(len(input_string))
+        self.deltas = bytearray()
+        self.steps = 0
+        self.cursor = 0  # step the attached engine is at
+        self.result = None
+        # Keyframes as parallel lists: step, delta offset, state code, position, stack
+        self.keyframe_steps = [0]
+        self.keyframes = [(0, npda.STATES.index(npda.Q0), 0, b"")]
+        self.position = 0
+
+    # Recording
+    def record(self, engine, depth, top):
+        """Store the move an engine just made from a stack of `depth` with `top`"""
+        if self.cursor != self.steps:
+            # Moving forward after seeking back starts a new branch from there
+            self.truncate(self.cursor)
+
+        config = engine.config
+        stack = config.stack.data
+        if depth and len(stack) >= depth and stack[depth - 1] == top:
+            kept = depth
+        else:
+            kept = max(depth - 1, 0)
+        pushed = stack[kept:]
+        if len(pushed) > _MAX_PUSH:
+            raise ValueError(f"a move can push at most {_MAX_PUSH} symbols")
+
+        op = npda.STATES.index(config.state) | (len(pushed) << _PUSH_SHIFT)
+        if config.position != self.position:
+            op |= _ADVANCED
+        if kept < depth:
+            op |= _POPPED
+        if engine.result is not None:
+            op |= _HALTED
+            self.result = engine.result
+        self.deltas.append(op)
+        self.deltas += pushed
+        self.position = config.position
+        self.steps += 1
+        self.cursor = self.steps
+
+        if self.steps % self.keyframe_interval == 0:
+            self.keyframe_steps.append(self.steps)
+            self.keyframes.append((len(self.deltas), npda.STATES.index(config.state),
+                                   config.position, bytes(stack)))
+
+    def truncate(self, step):
+        """Drop every move after `step`"""
+        config, offset = self._replay(step)
+        del self.deltas[offset:]
+        index = bisect.bisect_right(self.keyframe_steps, step)
+        del self.keyframe_steps[index:]
+        del self.keyframes[index:]
+        self.steps = self.cursor = step
+        self.position = config.position
+        self.result = None
+
+    # Seeking
+    def _replay(self, step):
+        """Configuration after `step` moves and the delta offset of the next move"""
+        if not 0 <= step <= self.steps:
+            raise IndexError(f"step {step} outside 0..{self.steps}")
+        index = bisect.bisect_right(self.keyframe_steps, step) - 1
+        current = self.keyframe_steps[index]
+        offset, state, position, stack = self.keyframes[index]
+        stack = bytearray(stack)
+        deltas = self.deltas
+        while current < step:
+            op = deltas[offset]
+            pushed = op >> _PUSH_SHIFT
+            if op & _POPPED:
+                stack.pop()
+            stack += deltas[offset + 1:offset + 1 + pushed]
+            if op & _ADVANCED:
+                position += 1
+            state = op & 0x03
+            offset += 1 + pushed
+            current += 1
+        config = npda.Configuration(npda.STATES[state], position, npda.PushdownStack())
+        config.stack.data = stack
+        return config, offset
+
+    def configuration_at(self, step):
+        return self._replay(step)[0]
+
+    def halted_at(self, step):
+        """Whether the run had halted after `step` moves"""
+        return self.result is not None and step == self.steps
+
+    def moves(self):
+        """Iterate over the raw deltas as (op, pushed bytes)"""
+        deltas = self.deltas
+        offset = 0
+        while offset < len(deltas):
+            op = deltas[offset]
+            pushed = op >> _PUSH_SHIFT
+            yield op, bytes(deltas[offset + 1:offset + 1 + pushed])
+            offset += 1 + pushed
+
+    def first_difference(self, other):
+        """First step at which two traces diverge, or None if they are identical"""
+        if self.input_string != other.input_string:
+            return 0
+        for step, (mine, theirs) in enumerate(zip(self.moves(), other.moves())):
+            if mine != theirs:
+                return step
+        if self.steps != other.steps:
+            return min(self.steps, other.steps)
+        return None
+
+    # Storage
+    def save(self, path):
+        header = json.dumps({
+            "input": self.input_string,
+            "steps": self.steps,
+            "keyframe_interval": self.keyframe_interval,
+            "result": self.result.as_dict() if self.result else None,
+        }).encode("utf-8")
+        with open(path, "wb") as output:
+            output.write(MAGIC)
+            output.write(_HEADER.pack(len(header)))
+            output.write(header)
+            output.write(_HEADER.pack(len(self.deltas)))
+            output.write(self.deltas)
+            output.write(_HEADER.pack(len(self.keyframes)))
+            for step, (offset, state, position, stack) in zip(self.keyframe_steps, self.keyframes):
+                output.write(_KEYFRAME.pack(step, offset, state, position, len(stack)))
+                output.write(stack)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as source:
+            if source.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an NPDA trace")
+
+            def read_block():
+                (length,) = _HEADER.unpack(source.read(_HEADER.size))
+                return source.read(length)
+
+            header = json.loads(read_block().decode("utf-8"))
+            trace = cls(header["input"], header["keyframe_interval"])
+            trace.deltas = bytearray(read_block())
+            trace.steps = trace.cursor = header["steps"]
+            if header["result"] is not None:
+                trace.result = npda.Result(**header["result"])
+
+            (count,) = _HEADER.unpack(source.read(_HEADER.size))
+            trace.keyframe_steps = []
+            trace.keyframes = []
+            for _ in range(count):
+                step, offset, state, position, length = _KEYFRAME.unpack(source.read(_KEYFRAME.size))
+                trace.keyframe_steps.append(step)
+                trace.keyframes.append((offset, state, position, source.read(length)))
+        trace.position = trace.configuration_at(trace.steps).position
+        return trace
+
+
+def record_run(string, center=None):
+    """Simulate a whole run step by step and return its trace"""
+    if center is None:
+        center = len(string) // 2
+    engine = npda.PalindromeNPDA(string)
+    engine.trace = Trace(string)
+    for _ in range(center):
+        engine.step()
+    engine.choose_center()
+    while engine.step() == npda.CONTINUE:
+        pass
+    return engine.trace
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record, inspect and compare NPDA traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="record the run of a string")
+    record.add_argument("string")
+    record.add_argument("--center", type=int, help="symbols pushed before guessing the center")
+    record.add_argument("-o", "--output", required=True)
+
+    show = commands.add_parser("show", help="print the configuration at a step")
+    show.add_argument("trace")
+    show.add_argument("--step", type=int, help="default: the last step")
+
+    diff = commands.add_parser("diff", help="report where traces diverge from a base trace")
+    diff.add_argument("base")
+    diff.add_argument("others", nargs="+")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        trace = record_run(args.string, args.center)
+        trace.save(args.output)
+        print(f"{trace.steps} steps: {trace.result.describe()}")
+        return 0
+
+    if args.command == "show":
+        trace = Trace.load(args.trace)
+        step = trace.steps if args.step is None else args.step
+        config = trace.configuration_at(step)
+        print(f"step {step}/{trace.steps}: state {config.state}, position {config.position}, "
+              f"stack {config.stack.summary()}")
+        if trace.halted_at(step):
+            print(trace.result.describe())
+        return 0
+
+    base = Trace.load(args.base)
+    diverged = False
+    for path in args.others:
+        step = base.first_difference(Trace.load(path))
+        if step is None:
+            print(f"{path}: identical")
+        else:
+            diverged = True
+            print(f"{path}: diverges at step {step}")
+    return 1 if diverged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Decide many strings of the same length at once.
+
+Corpora of millions of equal-length strings do not need one run of the
+automaton per string: every row accepts exactly when its second half equals
+its mirrored first half. With NumPy the strings are packed into a 2-D uint8
+matrix and all rows are compared in one vectorized operation. Without it
+each row is bit-packed into two integers (a = 0, b = 1), the first half
+already mirrored, and their XOR locates the first mismatch. Either way the
+result is a boolean mask plus, for rejected rows, the position that npda.run
+reports:
+
+    python3 vectorized.py corpus.txt
+
+NumPy is optional: pip3 install numpy
+"""
+import argparse
+import sys
+import time
+
+import npda
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NUMPY_MIN_ROWS = 64  # smaller batches are faster without the overhead of building a matrix
+
+_BITS = str.maketrans(npda.ALPHABET, "01")
+
+
+class BatchResult:
+    """Verdicts of a batch of strings of length n, one row per string.
+
+    `accepted` and `valid` are boolean masks and `position` holds the
+    position of the rejection (-1 for accepted and invalid rows), as NumPy
+    arrays or lists depending on the backend.
+    """
+
+    def __init__(self, rows, length, accepted, position, valid):
+        self.rows = rows
+        self.length = length
+        self.accepted = accepted
+        self.position = position
+        self.valid = valid
+
+    def __len__(self):
+        return len(self.accepted)
+
+    def accepted_count(self):
+        return int(sum(self.accepted))
+
+    def result(self, i):
+        """npda.Result of row i, exactly as npda.run reports it"""
+        n = self.length
+        center = n // 2
+        if not self.valid[i]:
+            raise ValueError(npda.validate(self.string(i)))
+        if self.accepted[i]:
+            return npda.Result(True, center=center)
+        position = int(self.position[i])
+        if n % 2 and position == n - 1:
+            return npda.Result(False, npda.STACK_EMPTY_EARLY, position, center=center)
+        row = self.string(i)
+        return npda.Result(False, npda.MISMATCH, position, row[2 * center - 1 - position], row[position],
+                           center)
+
+    def string(self, i):
+        row = self.rows[i]
+        return row if isinstance(row, str) else row.tobytes().decode("latin-1")
+
+
+def pack(strings):
+    """2-D uint8 NumPy matrix of equal-length strings"""
+    if numpy is None:
+        raise SystemExit("packing into a matrix needs NumPy: pip3 install numpy")
+    strings = list(strings)
+    length = len(strings[0]) if strings else 0
+    if any(len(string) != length for string in strings):
+        raise ValueError("all strings of a batch must have the same length")
+    data = "".join(strings).encode("latin-1", "replace")  # other symbols are invalid anyway
+    return numpy.frombuffer(data, dtype=numpy.uint8).reshape(len(strings), length)
+
+
+def decide_matrix(matrix):
+    """Decide every row of a 2-D uint8 matrix at once"""
+    length = matrix.shape[1]
+    center = length // 2
+    a, b = npda.ALPHABET.encode("ascii")
+    valid = ((matrix == a) | (matrix == b)).all(axis=1) & (length > 0)
+
+    # Position center + k is matched against the symbol pushed at center - 1 - k
+    if center:
+        differs = matrix[:, center:2 * center] != matrix[:, center - 1::-1]
+        mismatched = differs.any(axis=1)
+        first = differs.argmax(axis=1)
+    else:
+        mismatched = numpy.zeros(len(matrix), dtype=bool)
+        first = numpy.zeros(len(matrix), dtype=numpy.intp)
+    position = numpy.where(mismatched, center + first, length - 1 if length % 2 else -1)
+    # Odd rows that match up to the center still read one symbol on an empty stack
+    accepted = valid & ~mismatched & (length % 2 == 0)
+    position = numpy.where(valid & ~accepted, position, -1)
+    return BatchResult(matrix, length, accepted, position, valid)
+
+
+def decide_packed(strings):
+    """Decide equal-length strings row by row with bit-packed halves (no NumPy needed)"""
+    strings = list(strings)
+    length = len(strings[0]) if strings else 0
+    center = length // 2
+    odd_position = length - 1 if length % 2 else -1
+    accepted, positions, valid = [], [], []
+    for string in strings:
+        if len(string) != length:
+            raise ValueError("all strings of a batch must have the same length")
+        if not string or string.strip(npda.ALPHABET):
+            accepted.append(False)
+            positions.append(-1)
+            valid.append(False)
+            continue
+        # Both halves in reading order of the matching phase, first symbol as the top bit
+        difference = (int(string[center:2 * center].translate(_BITS) or "0", 2)
+                      ^ int(string[:center][::-1].translate(_BITS) or "0", 2))
+        if difference:
+            position = center + center - difference.bit_length()
+        else:
+            position = odd_position
+        accepted.append(position < 0)
+        positions.append(position)
+        valid.append(True)
+    return BatchResult(strings, length, accepted, positions, valid)
+
+
+def decide(strings):
+    """Decide equal-length strings with the fastest available backend"""
+    strings = list(strings)
+    if numpy is not None and len(strings) >= NUMPY_MIN_ROWS:
+        return decide_matrix(pack(strings))
+    return decide_packed(strings)
+
+
+def decide_all(strings):
+    """npda.Result (or None for invalid input) of every string, any lengths, in order"""
+    strings = list(strings)
+    by_length = {}
+    for i, string in enumerate(strings):
+        by_length.setdefault(len(string), []).append(i)
+    results = [None] * len(strings)
+    for indices in by_length.values():
+        batch = decide([strings[i] for i in indices])
+        for row, i in enumerate(indices):
+            if batch.valid[row]:
+                results[i] = batch.result(row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decide a corpus of equal-length strings in one batch")
+    parser.add_argument("file", help="newline-delimited strings of one length")
+    parser.add_argument("--no-numpy", action="store_true", help="use the bit-packed backend")
+    args = parser.parse_args(argv)
+
+    with open(args.file, encoding="utf-8") as source:
+        strings = source.read().splitlines()
+    start = time.perf_counter()
+    try:
+        batch = decide_packed(strings) if args.no_numpy or numpy is None else decide_matrix(pack(strings))
+    except ValueError as error:
+        parser.error(str(error))
+    elapsed = time.perf_counter() - start
+    for row in range(len(batch)):
+        if not batch.valid[row]:
+            print(f"{row + 1}: invalid")
+        elif not batch.accepted[row]:
+            print(f"{row + 1}: {batch.result(row).describe()}")
+    print(f"{len(batch)} strings: {batch.accepted_count()} accepted in {elapsed:.3f}s "
+          f"({len(batch) / max(elapsed, 1e-9):,.0f} strings/s, "
+          f"{'NumPy' if numpy is not None and not args.no_numpy else 'bit-packed'})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
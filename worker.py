@@ -0,0 +1,96 @@
+"""Long NPDA computations in a background process.
+
+The visualizer must not block its event loop while deciding or searching
+inputs of millions of symbols, and a thread running pure Python would
+still compete with Tk for the GIL. A BackgroundJob runs one task in a
+separate process and reports through a multiprocessing queue, which the GUI
+drains with after() without ever blocking:
+
+    ("progress", done, total)  every npda.PROGRESS_EVERY iterations
+    ("result", value)          once, when the task has finished
+    ("error", message)         instead of a result
+    ("cancelled",)             after cancel()
+
+Nothing here imports Tk.
+"""
+import multiprocessing
+import queue
+import time
+
+import fastpath
+import mapped_input
+import npda
+
+CANCEL_GRACE = 1.0  # seconds a cancelled task may take to stop before it is terminated
+
+
+class Cancelled(Exception):
+    pass
+
+
+TASKS = {
+    "decide": npda.run,
+    "prescreen": fastpath.prescreen,
+    "search": npda.search,
+    "mapped": mapped_input.decide_file,  # the "string" is the path of a file to map
+}
+
+
+def _run(task, string, messages, cancel):
+    """Process entry point"""
+    def progress(done, total):
+        if cancel.is_set():
+            raise Cancelled
+        messages.put(("progress", done, total))
+
+    try:
+        messages.put(("result", TASKS[task](string, progress=progress)))
+    except Cancelled:
+        messages.put(("cancelled",))
+    except ValueError as error:
+        messages.put(("error", str(error)))  # invalid input, worded for the user
+    except Exception as error:
+        messages.put(("error", f"{type(error).__name__}: {error}"))
+
+
+class BackgroundJob:
+    """One task running in its own process"""
+
+    def __init__(self, task, string):
+        self.task = task
+        self.string = string
+        self.messages = multiprocessing.Queue()
+        self.cancel_event = multiprocessing.Event()
+        self.process = multiprocessing.Process(target=_run, args=(task, string, self.messages,
+                                                                  self.cancel_event), daemon=True)
+        self.cancelled_at = None
+        self.finished = False
+        self.started = time.monotonic()
+        self.process.start()
+
+    def poll(self, limit=100):
+        """Messages that have arrived, without blocking"""
+        messages = []
+        while len(messages) < limit:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            messages.append(message)
+            if message[0] != "progress":
+                self.finished = True
+                break
+        if (self.cancelled_at is not None and not self.finished
+                and time.monotonic() - self.cancelled_at > CANCEL_GRACE):
+            # The task did not reach a progress check in time
+            self.process.terminate()
+            self.finished = True
+            messages.append(("cancelled",))
+        if self.finished:
+            self.process.join(timeout=0)
+        return messages
+
+    def cancel(self):
+        if self.cancelled_at is None and not self.finished:
+            self.cancelled_at = time.monotonic()
+            self.cancel_event.set()